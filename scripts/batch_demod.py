@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Headless batch demodulation of many captures to WAV or NPY files
+
+Examples:
+
+    python batch_demod.py "~/caps/*/*.cu8" -fs 2.4e6 -fc -200e3 -o ~/audio -j 16
+    python batch_demod.py manifest.csv -o ~/audio --format npy -j 16
+    python batch_demod.py "~/caps/*.bin" -fs 2.4e6 --dtype cu8 -o ~/audio
+
+The sample format of each capture is --dtype or the manifest's dtype column,
+else that of its SigMF sidecar or file suffix (.cu8, .cs8, .cs16, .cf32, .cf64).
+
+Outputs mirror the capture paths below the glob's directory (or the manifest's),
+e.g. ~/caps/night1/cap.cu8 -> ~/audio/night1/cap.cu8.wav.
+Rerunning skips the captures whose output already exists.
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import csv
+import sys
+import time
+
+from radioutils.batch import make_jobs, run, summary
+
+
+def main():
+    p = ArgumentParser(description="batch demodulation of SDR captures")
+    p.add_argument("sources", help="capture glob patterns and/or .csv manifests", nargs="+")
+    p.add_argument("-o", "--outdir", help="output directory", required=True)
+    p.add_argument("-fs", help="default sampling frequency [Hz]", type=float)
+    p.add_argument("-fc", help="default baseband tuning freq [Hz]", type=float)
+    p.add_argument(
+        "-m", "--mode", help="default demodulation", choices=["am", "fm", "ssb"], default="fm"
+    )
+    p.add_argument("--dtype", help="default sample format, e.g. cu8, cs8, cs16, cf32")
+    p.add_argument("-fsaudio", help="audio sampling frequency [Hz]", type=int, default=48000)
+    p.add_argument("--format", help="output format", choices=["wav", "npy"], default="wav")
+    p.add_argument("-j", "--workers", help="number of processes", type=int)
+    p.add_argument("--summary", help="also write the per-file results to this CSV file")
+    P = p.parse_args()
+
+    jobs = make_jobs(P.sources, Path(P.outdir), P.fs, P.fc, P.mode, P.format, P.dtype)
+    tic = time.perf_counter()
+    results = run(jobs, P.fsaudio, P.workers)
+
+    print(summary(results, time.perf_counter() - tic))
+
+    if P.summary:
+        with Path(P.summary).expanduser().open("w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["fn", "status", "samples", "seconds", "message"])
+            w.writerows(results)
+
+    if any(r.status == "failed" for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark suite: loadbin (sizes x formats), freq_translate, the filter designers,
+final_filter, downsample, am/fm/ssb demodulation, Link.fspl and rain_attenuation.
+
+Synthetic captures (radioutils.synth) are written to a temporary directory.
+Each result is printed, and with -o appended as one JSON line with the machine, library
+versions and samples/s, to compare releases on the same hardware:
+
+    python benchmark.py -o bench.jsonl
+    python benchmark.py --quick -k demod
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Callable
+import json
+import platform
+import tempfile
+import timeit
+
+import numpy as np
+import scipy
+
+import radioutils as ru
+from radioutils.impairments import rain_attenuation
+from radioutils.synth import am_signal, fm_signal, ssb_signal, write_capture
+
+fs = 2_400_000
+fsaudio = 48000
+fc = 200e3  # carrier of the synthetic captures; demodulated with -fc
+
+
+def cases(tmpdir: Path, n: int, sizes: list[int]) -> list[tuple[str, dict, int, Callable]]:
+    """(benchmark name, parameters, samples per call, function) of every benchmark"""
+    out: list[tuple[str, dict, int, Callable]] = []
+
+    sig = fm_signal(max(sizes), fs, fc)
+    for size in sizes:
+        for dtype in ("cu8", "cs8", "cs16", "cf32"):
+            fn = write_capture(tmpdir / f"load_{size}.{dtype}", sig[:size], dtype)
+            params = {"size": size, "dtype": dtype}
+            out.append(
+                ("loadbin", params, size, lambda fn=fn, d=dtype: ru.loadbin(fn, fs, dtype=d))
+            )
+
+    x = sig[:n].copy()
+    out.append(("freq_translate", {}, n, lambda: ru.freq_translate(x, -fc, fs, out=x)))
+
+    for name, design in (
+        ("lpf_design", ru.lpf_design),
+        ("hpf_design", ru.hpf_design),
+        ("bpf_design", ru.bpf_design),
+    ):
+        # uncached design time
+        out.append((name, {}, 1, lambda d=design: d.__wrapped__(fsaudio, 10e3)))
+
+    audio = np.real(sig[: n // 50]).astype(np.float64)
+    for ftype in ("lpf", "hpf", "bpf"):
+        out.append(
+            (
+                "final_filter",
+                {"ftype": ftype},
+                audio.size,
+                lambda t=ftype: ru.final_filter(audio, fsaudio, 10e3, t),
+            )
+        )
+
+    for label, kw in (
+        ("zero_phase", {}),
+        ("causal", {"zero_phase": False}),
+        ("multistage", {"fpass": 15e3}),
+    ):
+        out.append(
+            ("downsample", {"mode": label}, n, lambda k=kw: ru.downsample(x, fs, fsaudio, **k))
+        )
+
+    # wideband capture: the multistage CIC front end against one polyphase FIR
+    wide = fm_signal(n, 10_000_000, 1e6)
+    for label, kw in (("causal", {"zero_phase": False}), ("multistage", {"fpass": 10e3})):
+        for precision in ("float32", "float64"):
+            params = {"fs": 10_000_000, "mode": label, "precision": precision}
+            out.append(
+                (
+                    "downsample",
+                    params,
+                    n,
+                    lambda k=kw, p=precision: ru.downsample(
+                        wide, 10_000_000, fsaudio, precision=p, **k
+                    ),
+                )
+            )
+
+    captures = {
+        "am": write_capture(tmpdir / "am.cf32", am_signal(n, fs, fc), fs=fs),
+        "fm": write_capture(tmpdir / "fm.cu8", fm_signal(n, fs, fc), "cu8", fs=fs),
+        "ssb": write_capture(tmpdir / "ssb.cs16", ssb_signal(n, fs, fc), "cs16", fs=fs),
+    }
+    demods = {"am": ru.am_demod, "fm": ru.fm_demod, "ssb": ru.ssb_demod}
+    for mode, demod in demods.items():
+        for causal in (False, True):
+            params = {"mode": mode, "causal": causal, "input": captures[mode].suffix[1:]}
+            out.append(
+                (
+                    "demod",
+                    params,
+                    n,
+                    lambda d=demod, c=causal, f=captures[mode]: d(f, fs, fsaudio, -fc, causal=c),
+                )
+            )
+
+    ranges = np.linspace(1, 100e3, 10**6)
+    link = ru.Link(ranges, 2.4e9)
+    out.append(("Link.fspl", {}, ranges.size, link.fspl))
+
+    freqs = np.logspace(9, 12, 10**5)
+    for pol in ("v", 45.0):
+        out.append(
+            (
+                "rain_attenuation",
+                {"polarization": pol},
+                freqs.size,
+                lambda p=pol: rain_attenuation(freqs, 10.0, p, 40.0),
+            )
+        )
+
+    return out
+
+
+def environment() -> dict:
+    """library versions and machine of the results"""
+    try:
+        version = metadata.version("radioutils")
+    except metadata.PackageNotFoundError:  # run from a source tree
+        version = "source"
+
+    return {
+        "radioutils": version,
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "node": platform.node(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def main():
+    p = ArgumentParser(description="radioutils throughput benchmarks")
+    p.add_argument("-o", "--out", help="append results to this JSON lines file")
+    p.add_argument("-k", help="only run benchmarks whose name contains this")
+    p.add_argument("-r", "--repeat", help="timing repeats (best is kept)", type=int, default=3)
+    p.add_argument("--quick", help="small arrays, for a smoke test", action="store_true")
+    P = p.parse_args()
+
+    n = 2**18 if P.quick else 2**22
+    sizes = [2**16, 2**18] if P.quick else [2**20, 2**24]
+    env = environment()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+        for name, params, samples, func in cases(Path(tmp), n, sizes):
+            if P.k and P.k not in name:
+                continue
+
+            func()  # warm up: filter designs, page cache
+            seconds = min(timeit.repeat(func, number=1, repeat=P.repeat))
+            r = {"benchmark": name, **params, "samples": samples, "seconds": seconds}
+            r["samples_per_s"] = samples / seconds
+            results.append(r)
+
+            label = " ".join(f"{k}={v}" for k, v in params.items())
+            print(
+                f"{name:18s} {label:40s} {seconds:9.5f} s {samples / seconds / 1e6:10.2f} Msamp/s"
+            )
+
+    if P.out:
+        with Path(P.out).expanduser().open("a") as f:
+            for r in results:
+                f.write(json.dumps(r | env) + "\n")
+
+
+if __name__ == "__main__":
+    main()
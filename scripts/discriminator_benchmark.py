@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Benchmark the FM discriminator kernels against the original diff(unwrap(angle(x))) path
+"""
+
+from argparse import ArgumentParser
+import timeit
+
+import numpy as np
+
+from radioutils.discriminator import discriminate
+
+
+def main():
+    p = ArgumentParser(description="FM discriminator throughput")
+    p.add_argument("-n", help="number of complex64 samples", type=int, default=2**22)
+    p.add_argument("-r", "--repeat", help="timing repeats", type=int, default=5)
+    P = p.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = np.exp(1j * np.cumsum(rng.uniform(-2, 2, P.n))).astype(np.complex64)
+    out = np.empty(P.n - 1, np.float32)
+
+    ref = np.diff(np.unwrap(np.angle(x)))
+
+    print(f"{P.n} samples")
+    for method in ("unwrap", "conj", "fast"):
+        t = min(
+            timeit.repeat(
+                lambda: discriminate(x, 1.0, method=method, out=out), number=1, repeat=P.repeat
+            )
+        )
+        err = np.abs(out - ref).max()
+        print(f"{method:8s} {P.n / t / 1e6:8.1f} Msamples/s  max error {err:.1e} rad")
+
+
+if __name__ == "__main__":
+    main()
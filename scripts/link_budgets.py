@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Link budgets of a whole link table (CSV with a header row, or NPZ) in one pass
+
+Columns: range_m, freq_hz, tx_dbm, rx_dbm and optionally tx_gain_dbi, rx_gain_dbi, loss_db.
+The table is written back with fspl_db, prx_dbm (received power) and margin_db columns added.
+
+    python link_budgets.py links.csv -o budget.npz --rain 25 --polarization v --elevation 30
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import time
+
+import numpy as np
+
+from radioutils.impairments import rain_attenuation
+from radioutils.linkbudget import budget, columns, read_links, write_links
+
+
+def main():
+    p = ArgumentParser(description="link budgets of a link table")
+    p.add_argument("links", help="link table .csv or .npz")
+    p.add_argument("-o", "--out", help="output link table .csv or .npz", required=True)
+    p.add_argument("--rain", help="rain rate along every path [mm/hour]", type=float)
+    p.add_argument("--polarization", help="'h', 'v' or degrees", default="v")
+    p.add_argument("--elevation", help="path elevation angle [degrees]", type=float, default=0.0)
+    P = p.parse_args()
+
+    tic = time.perf_counter()
+    table = read_links(Path(P.links))
+
+    if P.rain:
+        pol = P.polarization if P.polarization in ("h", "v") else float(P.polarization)
+        rain = rain_attenuation(table["freq_hz"], P.rain, pol, P.elevation)
+        table["loss_db"] = table.get("loss_db", 0.0) + rain * table["range_m"] / 1e3
+
+    res = budget(table)
+    table |= columns(res)
+    write_links(Path(P.out), table)
+
+    n = res.size
+    print(
+        f"{n} links in {time.perf_counter() - tic:.2f} s: {np.count_nonzero(res['margin_db'] < 0)}"
+        f" with negative margin, median margin {np.median(res['margin_db']):.1f} dB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,19 @@ import logging
 import numpy as np
 import scipy.signal as signal
 
+from .filtercache import cached
+from .formats import capture_format, iq_format, sigmf_meta, to_complex
+from .nco import NCO
+from .resample import Resampler, rational, resample_design
+from .multistage import plan_decimation
+from .ddc import DDC, if_rate
+from .discriminator import discriminate
+from .fir import FirFilter
+from .workspace import Workspace
+from .profiling import Profiler, stage as _stage
+
+FM_AUDIO_BW = 15e3  # [Hz] broadcast FM monaural audio bandwidth
+
 
 class Link:
     def __init__(self, range_m, freq_hz, tx_dbm=None, rx_dbm=None):
@@ -77,7 +90,7 @@ def playaudio(dat, fs: int, ofn: Path | None = None):
     else:
         snd = dat  # monaural
 
-    snd = snd * fnorm / snd.max()
+    snd = snd * (fnorm / snd.max())
     # %% optional write wav file
     if ofn:
         ofn = Path(ofn).expanduser()
@@ -109,46 +122,118 @@ def playaudio(dat, fs: int, ofn: Path | None = None):
         print(f"skipping playback due to fs={fs} Hz")
 
 
-def loadbin(fn: Path, fs: int, tlim=None, isamp=None):
+def loadbin(
+    fn: Path,
+    fs: int,
+    tlim=None,
+    isamp=None,
+    mmap: bool = False,
+    dtype: str | None = None,
+    prefetch: bool = False,
+):
     """
-    we assume single-precision complex64 floating point data
+    By default we assume single-precision complex64 floating point data
     Often we load data from GNU Radio in complex64 (what Matlab calls complex float32) format.
     complex64 means single-precision complex floating-point data I + jQ.
-    """
-    LSAMP = 8  # 8 bytes per single-precision complex
 
+    dtype: sample format "cu8" (RTL-SDR), "cs8" (HackRF), "cs16", "cf32" (complex64), "cf64"
+      or a complex SigMF datatype. Integer samples are scaled to +/- 1.0 complex64.
+      If not given, the datatype of a SigMF .sigmf-meta sidecar is used, else the format of a
+      known file suffix (.cu8, .cs8, .cs16, .cf32, .cfile, .cf64), else "cf32".
+      The sidecar also supplies fs if fs is None.
+    mmap: return a read-only np.memmap view of the requested samples instead of reading into RAM.
+      Nothing is paged in until a stage touches the samples, so even huge captures open instantly.
+      Integer formats are converted when loaded; radioutils.stream converts them block by block.
+    prefetch: with mmap, tell the OS the mapping of the samples is read sequentially and will be
+      needed soon (madvise), so it reads ahead and the first stages touching them wait less
+      on page faults.
+    """
     if fn is None:
         return
-    fn = Path(fn).expanduser()
 
+    raw, fmt = _openbin(fn, fs, tlim, isamp, mmap, dtype)
+    if mmap and prefetch:
+        from .reader import madvise
+
+        for advice in ("sequential", "willneed"):
+            madvise(raw, advice)
+    sig = to_complex(raw, fmt)
+
+    assert sig.ndim == 1 and np.iscomplexobj(sig), "file read incorrectly"
+    assert sig.size > 0, "read past end of file, did you specify incorrect time limits?"
+
+    return sig
+
+
+def _openbin(fn: Path, fs: float | None, tlim, isamp, mmap: bool, dtype: str | None):
+    """
+    interleaved I/Q values of the requested part of capture "fn", and their format
+    """
+    fn, start, count, fmt = _span(fn, fs, tlim, isamp, dtype)
+
+    if mmap:
+        stop = None if count < 0 else 2 * (start + count)
+        raw = np.memmap(fn, dtype=fmt.raw, mode="r")[2 * start : stop]
+    else:
+        with fn.open("rb") as f:
+            f.seek(start * fmt.itemsize)
+            raw = np.fromfile(f, fmt.raw, 2 * count if count > 0 else count)
+
+    return raw[: raw.size - raw.size % 2], fmt
+
+
+def _capture_fs(fn: Path, fs):
+    """fs, else the sample rate of capture "fn" from its SigMF sidecar"""
+    if fs is None:
+        fs = sigmf_meta(fn).get("fs")
     if fs is None:
         raise ValueError(f"must specify sampling freq. for {fn}")
+
+    return fs
+
+
+def _span(fn: Path, fs: float | None, tlim, isamp, dtype: str | None):
+    """
+    first sample and sample count (-1: to end of file) of the requested part of capture "fn",
+    and its format
+    """
+    fn = Path(fn).expanduser()
+
+    meta = sigmf_meta(fn)
+    fmt = iq_format(capture_format(fn, dtype, meta))
+    fs = fs if fs is not None else _capture_fs(fn, meta.get("fs"))
     # %%
     if isinstance(tlim, (tuple, np.ndarray, list)):
         assert len(tlim) == 2, "specify start and end times"
-        startbyte = int(LSAMP * tlim[0] * fs)
-        count = int((tlim[1] - tlim[0]) * fs)
+        start = int(tlim[0] * fs)
+        count = -1 if tlim[1] is None else int((tlim[1] - tlim[0]) * fs)
     elif isamp is not None:
         assert len(isamp) == 2, "specify start and end sample indices"
 
-        startbyte = LSAMP * isamp[0]
+        start = isamp[0]
 
         if isinstance(tlim, (float, int)):  # to start at a particular time
-            startbyte += int(LSAMP * tlim * fs)
+            start += int(tlim * fs)
 
         count = isamp[1] - isamp[0]
     else:
-        startbyte = 0
+        start = 0
         count = -1  # count=None is not accepted
-    # %%
-    assert startbyte % 8 == 0, "must have multiple of 8 bytes or entire file is read incorrectly"
 
-    with fn.open("rb") as f:
-        f.seek(startbyte)
-        sig = np.fromfile(f, np.complex64, count)
+    return fn, start, count, fmt
 
-    assert sig.ndim == 1 and np.iscomplexobj(sig), "file read incorrectly"
-    assert sig.size > 0, "read past end of file, did you specify incorrect time limits?"
+
+def as_precision(sig, precision: str):
+    """
+    sig in single precision (complex64 or float32) for precision="float32".
+    For "float64" sig is returned as is, not promoted: the filters use double-precision taps,
+    but the causal resampler computes in the precision of its input, so a complex64 capture
+    stays single precision there. Pass sig.astype(np.complex128) for double precision throughout.
+    """
+    if precision == "float32":
+        return sig.astype(np.complex64 if np.iscomplexobj(sig) else np.float32, copy=False)
+    if precision != "float64":
+        raise ValueError(f"unknown precision {precision}")
 
     return sig
 
@@ -161,6 +246,15 @@ def am_demod(
     fcutoff: float = 10e3,
     frumble: float | None = None,
     verbose: bool = False,
+    causal: bool = False,
+    multistage: bool = False,
+    ddc: bool = False,
+    precision: str = "float64",
+    workspace: Workspace | None = None,
+    axis: int = -1,
+    workers: int | None = None,
+    dtype: str | None = None,
+    profiler: Profiler | None = None,
 ):
     """
     Envelope demodulates AM with carrier (DSB or SSB).
@@ -168,11 +262,30 @@ def am_demod(
 
     inputs:
     -------,
-    sig: downconverted (baseband) signal, normally containing amplitude-modulated information with carrier
+    sig: downconverted (baseband) signal, normally containing amplitude-modulated information with carrier.
+      May be a Path or a read-only loadbin(..., mmap=True) view, which is never modified.
+      For a Path, fs=None takes the sample rate from the capture's SigMF sidecar.
+      An N-D array, e.g. (n_channels, n_samples), demodulates all channels in one call.
     fs: sampling frequency [Hz]
     fsaudio: local sound card sampling frequency for audio playback [Hz]
-    fcutoff: cutoff frequency of output lowpass filter [Hz]
+    fc: translation frequency [Hz], or array of one frequency per channel
+    fcutoff: cutoff frequency of output lowpass filter [Hz], None for no lowpass
     frumble: optional cutoff freq for carrier beating removal [Hz]
+    causal: resample with a causal (not zero-phase) filter, as radioutils.stream does
+    multistage: resample through the cheapest CIC/half-band/FIR cascade (always causal)
+    ddc: translate, filter and decimate in one fused pass (radioutils.ddc, always causal)
+    precision: "float32" runs every stage in single precision (complex64/float32 samples and taps),
+      "float64" keeps the double-precision filters
+    workspace: radioutils.workspace.Workspace to take the intermediate arrays, oscillator,
+      filters and resampler from, to avoid allocating them again for each of many short signals.
+      With causal=True only small fixed-size temporaries are then allocated per call
+      (the zero-phase, ddc and multistage paths still allocate their outputs).
+      The result may then be a view of a workspace buffer, overwritten by the next call.
+    axis: time axis of an N-D sig
+    workers: demodulate the capture file "sig" in time segments on this many processes
+      (radioutils.parallel, always causal)
+    dtype: sample format of the capture file "sig", as in radioutils.loadbin
+    profiler: radioutils.profiling.Profiler recording each stage's time, samples and memory
 
     outputs:
     --------
@@ -180,126 +293,461 @@ def am_demod(
 
     Reference: https://www.mathworks.com/help/dsp/examples/envelope-detection.html
     """
+    if workers is not None:
+        from .parallel import demod_file
+
+        with _stage(profiler, "demod_file"):
+            return demod_file(
+                sig,
+                fs,
+                fsaudio,
+                fc,
+                "am",
+                workers,
+                dtype=dtype,
+                fcutoff=fcutoff,
+                frumble=frumble,
+                multistage=multistage,
+                precision=precision,
+            )
+
     if isinstance(sig, Path):
-        sig = loadbin(sig, fs)
+        fs = _capture_fs(sig, fs)
+        with _stage(profiler, "loadbin") as st:
+            sig = loadbin(sig, fs, mmap=True, dtype=dtype, prefetch=True)
+            st.samples = sig.size
+    with _stage(profiler, "as_precision", sig):
+        sig = np.moveaxis(as_precision(sig, precision), axis, -1)
     # if verbose:
     #     plotraw(sig, fs)
 
-    sig = freq_translate(sig, fc, fs)
-
-    sig = downsample(sig, fs, fsaudio, verbose)
+    if ddc:
+        with _stage(profiler, "ddc", sig):
+            sig = DDC(fc, fs, fsaudio, fcutoff if multistage else None)(sig)
+    else:
+        with _stage(profiler, "freq_translate", sig):
+            sig = freq_translate(
+                sig, fc, fs, out=_scratch(workspace, "translate", sig), workspace=workspace
+            )
+
+        with _stage(profiler, "downsample", sig):
+            sig = downsample(
+                sig,
+                fs,
+                fsaudio,
+                verbose,
+                zero_phase=not causal,
+                fpass=fcutoff if multistage else None,
+                precision=precision,
+                out=_scratch(workspace, "resample", sig, fsaudio / fs),
+                workspace=workspace,
+            )
     # reject signals outside our channel bandwidth
-    sig = final_filter(sig, fsaudio, fcutoff, ftype="lpf", verbose=verbose)
+    with _stage(profiler, "final_filter", sig):
+        sig = final_filter(
+            sig,
+            fsaudio,
+            fcutoff,
+            ftype="lpf",
+            verbose=verbose,
+            precision=precision,
+            out=_scratch(workspace, "filter", sig, dtype=np.result_type(sig, precision)),
+            workspace=workspace,
+        )
     # %% ideal diode: half-wave rectifier
-    sig = sig**2
+    with _stage(profiler, "square", sig):
+        sig = sig**2 if fcutoff is None else np.square(sig, out=sig)
     # %% optional rumble filter
-    sig = final_filter(sig, fsaudio, frumble, ftype="hpf", verbose=verbose)
-
-    return sig
-
-
-def downsample(sig, fs: int, fsaudio: int, verbose: bool = False):
+    if frumble is not None:
+        with _stage(profiler, "rumble_filter", sig):
+            sig = final_filter(
+                sig,
+                fsaudio,
+                frumble,
+                ftype="hpf",
+                verbose=verbose,
+                precision=precision,
+                out=_scratch(workspace, "rumble", sig),
+                workspace=workspace,
+            )
+
+    return np.moveaxis(sig, -1, axis)
+
+
+def downsample(
+    sig,
+    fs: int,
+    fsaudio: int,
+    verbose: bool = False,
+    zero_phase: bool = True,
+    fpass: float | None = None,
+    precision: str = "float64",
+    out=None,
+    axis: int = -1,
+    workspace: Workspace | None = None,
+):
+    """
+    polyphase rational resampling from fs to fsaudio, computing only the kept output samples
+
+    zero_phase: compensate the anti-alias filter delay.
+      False gives the causal result reproduced block by block in radioutils.stream
+    fpass: passband edge [Hz] to preserve. If given, resample through the cheapest
+      multistage cascade for that spec (radioutils.multistage), which is always causal.
+    precision: "float32" resamples in single precision
+    out: optional output array of at least ceil(n * fsaudio / fs) + 1 samples along "axis",
+      for n input samples. The resampled signal is written to its start and that view is
+      returned; the causal single-stage resampler then allocates no output.
+    axis: time axis, all other axes (e.g. channels) are resampled together
+    workspace: Workspace keeping the causal resampler, with its polyphase taps and scratch
+      buffers, for the next signal of the same rates, shape and dtype
+    """
+    sig = as_precision(sig, precision)
     if fs == fsaudio:
         return sig
 
-    decim = int(fs / fsaudio)
+    if axis != -1:
+        out = None if out is None else np.moveaxis(out, axis, -1)
+        y = downsample(
+            np.moveaxis(sig, axis, -1),
+            fs,
+            fsaudio,
+            verbose,
+            zero_phase,
+            fpass,
+            precision,
+            out,
+            workspace=workspace,
+        )
+        return np.moveaxis(y, -1, axis)
+
+    if fpass is not None and fsaudio < fs:
+        plan = plan_decimation(fs, fsaudio, fpass)
+        if verbose:
+            print(plan)
+        return _into(plan(sig).astype(sig.dtype, copy=False), out)
+
+    up, down = rational(fs, fsaudio)
     if verbose:
-        print("downsampling by factor of", decim)
+        print(f"resampling by factor of {up}/{down}")
 
     dtype = sig.dtype
 
-    sig = signal.decimate(sig, decim, zero_phase=True).astype(dtype)
+    if zero_phase:
+        h = resample_design(up, down)
+        if precision == "float32":
+            h = h.astype(np.float32)
+        y = signal.resample_poly(sig, up, down, axis=-1, window=h)
+        sig = _into(y.astype(dtype, copy=False), out)
+    else:
+        key = (up, down, sig.shape[:-1], sig.dtype)
+        sig = _reused(workspace, "resampler", key, lambda: Resampler(up, down))(sig, out)
 
     return sig
 
 
-def fm_demod(sig, fs: int, fsaudio: int, fc: float, fmdev=75e3, verbose: bool = False):
+def _into(y, out):
+    if out is None:
+        return y
+
+    n = y.shape[-1]
+    out[..., :n] = y
+    return out[..., :n]
+
+
+def _reused(workspace: Workspace | None, name: str, key, factory):
+    """
+    new stage object factory(), or with a workspace its stage "name" of the same key,
+    reset to the initial state
+    """
+    if workspace is None:
+        return factory()
+
+    s = workspace.stage(name, key, factory)
+    s.reset()
+    return s
+
+
+def _scratch(workspace: Workspace | None, name: str, sig, ratio: float = 1.0, dtype=None):
+    """
+    workspace buffer (default of sig's dtype) for sig resampled along its last axis by "ratio",
+    or None without a workspace
+    """
+    if workspace is None:
+        return None
+
+    n = sig.shape[-1]
+    if ratio != 1:
+        n = int(np.ceil(n * ratio)) + 2
+    return workspace.buffer(name, sig.shape[:-1] + (n,), sig.dtype if dtype is None else dtype)
+
+
+def fm_demod(
+    sig,
+    fs: int,
+    fsaudio: int,
+    fc: float,
+    fmdev=75e3,
+    verbose: bool = False,
+    causal: bool = False,
+    multistage: bool = False,
+    ddc: bool = False,
+    discriminator: str = "conj",
+    precision: str = "float64",
+    workspace: Workspace | None = None,
+    axis: int = -1,
+    workers: int | None = None,
+    dtype: str | None = None,
+    profiler: Profiler | None = None,
+):
     """
     currently this function discards all but the monaural audio.
 
+    sig: baseband signal, or N-D array of channels as in am_demod
+    fc: translation frequency [Hz], or array of one frequency per channel
     fmdev: FM deviation of monaural modulation in Hz  (for scaling)
+    causal: resample with a causal (not zero-phase) filter, as radioutils.stream does
+    multistage: resample through the cheapest CIC/half-band/FIR cascade (always causal)
+    ddc: first translate, channel filter and decimate to an intermediate rate of about 4*fmdev
+      in one fused pass (radioutils.ddc), and demodulate at that rate
+    discriminator: "conj", "fast" or "unwrap", see radioutils.discriminator
+    precision: "float32" runs every stage in single precision, as in am_demod
+    workspace: Workspace for the intermediate arrays, as in am_demod
+    axis: time axis of an N-D sig
+    workers: demodulate the capture file "sig" in parallel, as in am_demod
+    dtype: sample format of the capture file "sig", as in am_demod
+    profiler: Profiler recording each stage, as in am_demod
     """
-    if isinstance(sig, Path):
-        sig = loadbin(sig, fs)
+    if workers is not None:
+        from .parallel import demod_file
+
+        with _stage(profiler, "demod_file"):
+            return demod_file(
+                sig,
+                fs,
+                fsaudio,
+                fc,
+                "fm",
+                workers,
+                dtype=dtype,
+                fmdev=fmdev,
+                multistage=multistage,
+                ddc=ddc,
+                discriminator=discriminator,
+                precision=precision,
+            )
 
-    sig = freq_translate(sig, fc, fs)
-    # %% reject signals outside our channel bandwidth
-    sig = final_filter(sig, fs, fmdev * 1.5, ftype="lpf", verbose=verbose)
+    if isinstance(sig, Path):
+        fs = _capture_fs(sig, fs)
+        with _stage(profiler, "loadbin") as st:
+            sig = loadbin(sig, fs, mmap=True, dtype=dtype, prefetch=True)
+            st.samples = sig.size
+    with _stage(profiler, "as_precision", sig):
+        sig = np.moveaxis(as_precision(sig, precision), axis, -1)
+
+    fs_if = if_rate(fs, fsaudio, 4 * fmdev) if ddc else fs
+    if fs_if < fs:
+        with _stage(profiler, "ddc", sig):
+            sig = DDC(fc, fs, fs_if, fmdev * 1.5)(sig)
+    else:
+        with _stage(profiler, "freq_translate", sig):
+            sig = freq_translate(
+                sig, fc, fs, out=_scratch(workspace, "translate", sig), workspace=workspace
+            )
+        # %% reject signals outside our channel bandwidth
+        with _stage(profiler, "final_filter", sig):
+            sig = final_filter(
+                sig,
+                fs,
+                fmdev * 1.5,
+                ftype="lpf",
+                verbose=verbose,
+                precision=precision,
+                out=_scratch(workspace, "filter", sig, dtype=np.result_type(sig, precision)),
+                workspace=workspace,
+            )
 
     # FM is a time integral, angle modulation--so let's undo the FM
-    Cfm = fs / (2 * np.sqrt(2) * np.pi * fmdev)  # a scalar constant
-    sig = Cfm * np.diff(np.unwrap(np.angle(sig)))
+    Cfm = fs_if / (2 * np.sqrt(2) * np.pi * fmdev)  # a scalar constant
+    out = None
+    if workspace is not None and sig.shape[-1]:
+        shape = sig.shape[:-1] + (sig.shape[-1] - 1,)
+        out = workspace.buffer("discriminate", shape, np.finfo(sig.dtype).dtype)
+    with _stage(profiler, "discriminate", sig):
+        sig = discriminate(sig, Cfm, method=discriminator, out=out, workspace=workspace)
 
     if verbose:
         from .plots import plot_fmbaseband
 
-        plot_fmbaseband(sig, fs, 100e3)
+        plot_fmbaseband(sig, fs_if, 100e3)
 
     # demodulated monoaural_ audio (plain audio waveform)
     # This has to occur AFTER demodulation, since WBFM is often wider than soundcard sample rate!
-    m = downsample(sig, fs, fsaudio, verbose)
+    fpass = min(FM_AUDIO_BW, 0.4 * fsaudio) if multistage else None
+    with _stage(profiler, "downsample", sig):
+        m = downsample(
+            sig,
+            fs_if,
+            fsaudio,
+            verbose,
+            zero_phase=not causal,
+            fpass=fpass,
+            precision=precision,
+            out=_scratch(workspace, "resample", sig, fsaudio / fs_if),
+            workspace=workspace,
+        )
 
-    return m
+    return np.moveaxis(m, -1, axis)
 
 
-def ssb_demod(sig, fs: int, fsaudio: int, fc: float, fcutoff: float = 5e3, verbose: bool = False):
+def ssb_demod(
+    sig,
+    fs: int,
+    fsaudio: int,
+    fc: float,
+    fcutoff: float = 5e3,
+    verbose: bool = False,
+    causal: bool = False,
+    multistage: bool = False,
+    ddc: bool = False,
+    precision: str = "float64",
+    workspace: Workspace | None = None,
+    axis: int = -1,
+    workers: int | None = None,
+    dtype: str | None = None,
+    profiler: Profiler | None = None,
+):
     """
     filter method SSB/DSB suppressed carrier demodulation
 
-    sig: downconverted (baseband) signal, normally containing amplitude-modulated information
+    sig: downconverted (baseband) signal, normally containing amplitude-modulated information,
+      or N-D array of channels as in am_demod
     fs: sampling frequency [Hz]
     fsaudio: local sound card sampling frequency for audio playback [Hz]
-    fc: supressed carrier frequency (a priori)
+    fc: supressed carrier frequency (a priori), or array of one frequency per channel
     fcutoff: cutoff frequency of output lowpass filter [Hz]
+    causal: resample with a causal (not zero-phase) filter, as radioutils.stream does
+    multistage: resample through the cheapest CIC/half-band/FIR cascade (always causal)
+    ddc: translate, filter and decimate in one fused pass (radioutils.ddc, always causal)
+    precision: "float32" runs every stage in single precision, as in am_demod
+    workspace: Workspace for the intermediate arrays, as in am_demod
+    axis: time axis of an N-D sig
+    workers: demodulate the capture file "sig" in parallel, as in am_demod
+    dtype: sample format of the capture file "sig", as in am_demod
+    profiler: Profiler recording each stage, as in am_demod
     """
+    if workers is not None:
+        from .parallel import demod_file
+
+        with _stage(profiler, "demod_file"):
+            return demod_file(
+                sig,
+                fs,
+                fsaudio,
+                fc,
+                "ssb",
+                workers,
+                dtype=dtype,
+                fcutoff=fcutoff,
+                multistage=multistage,
+                precision=precision,
+            )
+
     if isinstance(sig, Path):
-        sig = loadbin(sig, fs)
-    # %% assign elapsed time vector
-    t = np.arange(0, sig.size / fs, 1 / fs)
+        fs = _capture_fs(sig, fs)
+        with _stage(profiler, "loadbin") as st:
+            sig = loadbin(sig, fs, mmap=True, dtype=dtype, prefetch=True)
+            st.samples = sig.size
+    with _stage(profiler, "as_precision", sig):
+        sig = np.moveaxis(as_precision(sig, precision), axis, -1)
     # %% SSB demod
-    bx = np.exp(1j * 2 * np.pi * fc * t)
-    sig *= bx[: sig.size]  # sometimes length was off by one
+    if ddc:
+        with _stage(profiler, "ddc", sig):
+            sig = DDC(fc, fs, fsaudio, fcutoff if multistage else None)(sig)
+        return np.moveaxis(sig, -1, axis)
+
+    with _stage(profiler, "freq_translate", sig):
+        sig = freq_translate(
+            sig, fc, fs, out=_scratch(workspace, "translate", sig), workspace=workspace
+        )
 
-    sig = downsample(sig, fs, fsaudio, verbose)
+    with _stage(profiler, "downsample", sig):
+        sig = downsample(
+            sig,
+            fs,
+            fsaudio,
+            verbose,
+            zero_phase=not causal,
+            fpass=fcutoff if multistage else None,
+            precision=precision,
+            out=_scratch(workspace, "resample", sig, fsaudio / fs),
+            workspace=workspace,
+        )
 
-    return sig
+    return np.moveaxis(sig, -1, axis)
+
+
+def freq_translate(
+    sig,
+    fc: float,
+    fs: int,
+    nco: NCO | None = None,
+    out=None,
+    axis: int = -1,
+    workspace: Workspace | None = None,
+):
+    """
+    multiply by exp(j 2 pi fc t), in place when the caller's buffer allows it.
+    Read-only inputs (e.g. loadbin(..., mmap=True) views) are copied on this first touch.
+
+    fc: frequency [Hz], or array of one frequency per channel of an N-D sig
+    nco: oscillator to continue from, to translate a long signal in consecutive calls
+    out: optional output array of sig's shape, instead of sig or a new array
+    axis: time axis of sig
+    workspace: Workspace keeping the oscillator table for the next signal of the same fc, fs
+    """
+    if fc is None:
+        return sig
 
+    if nco is None:
+        key = (np.asarray(fc).tolist(), fs)
+        nco = _reused(workspace, "nco", key, lambda: NCO(fc, fs))
 
-def freq_translate(sig, fc: float, fs: int):
-    # %% assign elapsed time vector
-    t = np.arange(sig.size) / fs
-    # %% frequency translate
-    if fc is not None:
-        bx = np.exp(1j * 2 * np.pi * fc * t)
-        sig *= bx[: sig.size]  # downshifted
+    if out is None:
+        out = sig if sig.flags.writeable else np.empty(sig.shape, sig.dtype)
 
-    return sig
+    y = nco.mix(np.moveaxis(sig, axis, -1), np.moveaxis(out, axis, -1))
+
+    return np.moveaxis(y, -1, axis)
 
 
 # def lpf_design(fs:int, fc:float, L:int):
 
 
-def lpf_design(fs: int, fcutoff, L=50):
+@cached
+def lpf_design(fs: int, fcutoff, L=50, precision: str = "float64"):
     """
     Design FIR low-pass filter coefficients "b"
     fcutoff: cutoff frequency [Hz]
     fs: sampling frequency [Hz]
     L: number of taps (more taps->narrower transition band->more CPU)
+    precision: "float64" or "float32" coefficients
 
     https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.remez.html
     """
     # 0.8*fc is arbitrary, for finite transition width
 
     # return signal.remez(L, [0, 0.8*fcutoff, fcutoff, 0.5*fs], [1., 0.], Hz=fs)
-    return signal.firwin(L, fcutoff, nyq=0.5 * fs, pass_zero=True)
+    return signal.firwin(L, fcutoff, fs=fs, pass_zero=True).astype(precision)
 
 
-def hpf_design(fs: int, fcutoff: float, L: int = 199):
+@cached
+def hpf_design(fs: int, fcutoff: float, L: int = 199, precision: str = "float64"):
     """
     Design FIR high-pass filter coefficients "b"
     fcutoff: cutoff frequency [Hz]
     fs: sampling frequency [Hz]
     L: number of taps (more taps->narrower transition band->more CPU)
+    precision: "float64" or "float32" coefficients
 
     https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.remez.html
     """
@@ -307,17 +755,21 @@ def hpf_design(fs: int, fcutoff: float, L: int = 199):
 
     # return signal.remez(L, [0, 0.8*fcutoff, fcutoff, 0.5*fs], [1., 0.], Hz=fs)
     return signal.firwin(
-        L, fcutoff, nyq=0.5 * fs, pass_zero=False, width=10, window="kaiser", scale=True
-    )
+        L, fcutoff, fs=fs, pass_zero=False, width=10, window="kaiser", scale=True
+    ).astype(precision)
 
 
-def bpf_design(fs: int, fcutoff: float, flow: float = 300.0, L: int = 256):
+@cached
+def bpf_design(
+    fs: int, fcutoff: float, flow: float = 300.0, L: int = 256, precision: str = "float64"
+):
     """
     Design FIR bandpass filter coefficients "b"
     fcutoff: cutoff frequency [Hz]
     fs: sampling frequency [Hz]
     flow: low cutoff freq [Hz] to eliminate rumble or beating carriers
     L: number of taps (more taps->narrower transition band->more CPU)
+    precision: "float64" or "float32" coefficients
 
     https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.remez.html
     """
@@ -335,7 +787,7 @@ def bpf_design(fs: int, fcutoff: float, flow: float = 300.0, L: int = 256):
             [flow, fcutoff],
             pass_zero=False,
             width=100,
-            nyq=0.5 * fs,
+            fs=fs,
             window="kaiser",
             scale=True,
         )
@@ -348,25 +800,49 @@ def bpf_design(fs: int, fcutoff: float, flow: float = 300.0, L: int = 256):
             oc.eval("pkg load signal")
             b = oc.fir1(L + 1, [0.03, 0.35], "bandpass")
 
-    return b
+    return np.asarray(b, dtype=precision)
 
 
-def final_filter(sig, fs: int, fcutoff: float | None, ftype: str, verbose: bool = False):
+def final_filter(
+    sig,
+    fs: int,
+    fcutoff: float | None,
+    ftype: str,
+    verbose: bool = False,
+    precision: str = "float64",
+    method: str = "auto",
+    out=None,
+    axis: int = -1,
+    workspace: Workspace | None = None,
+):
+    """
+    precision: "float32" filters complex64/float32 with float32 taps, and keeps that precision
+    method: "direct", "fft" (overlap-save) or "auto", whichever radioutils.fir models as faster.
+      All give the lfilter(b, 1, sig) output.
+    out: optional output array of sig's shape, of dtype result_type(sig, precision)
+    axis: time axis, all other axes (e.g. channels) are filtered together
+    workspace: Workspace keeping the filter and its scratch buffers for the next signal
+      of the same design, shape and dtype
+    """
     if fcutoff is None:
         return sig
 
     assert fcutoff < 0.5 * fs, "aliasing due to filter cutoff > 0.5*fs"
 
     if ftype == "lpf":
-        b = lpf_design(fs, fcutoff)
+        b = lpf_design(fs, fcutoff, precision=precision)
     elif ftype == "bpf":
-        b = bpf_design(fs, fcutoff)
+        b = bpf_design(fs, fcutoff, precision=precision)
     elif ftype == "hpf":
-        b = hpf_design(fs, fcutoff)
+        b = hpf_design(fs, fcutoff, precision=precision)
     else:
         raise ValueError(f"Unknown filter type {ftype}")
 
-    sig = signal.lfilter(b, 1, sig)
+    x = np.moveaxis(as_precision(sig, precision), axis, -1)
+    key = (fs, fcutoff, precision, method, x.shape[:-1], x.dtype)
+    fir = _reused(workspace, f"{ftype}_filter", key, lambda: FirFilter(b, method))
+    y = fir(x, None if out is None else np.moveaxis(out, axis, -1))
+    sig = np.moveaxis(y, -1, axis)
 
     if verbose:
         from .plots import plotfir
@@ -0,0 +1,218 @@
+"""
+Link availability from long rain-rate time series
+
+Rain-gauge records (e.g. years of 1-minute samples) are read from disk in chunks and turned
+into rain attenuation and fade margin time series of a link table (radioutils.linkbudget),
+while outage time, availability and fade-duration histograms are accumulated,
+so memory stays bounded by the chunk size however long the record is.
+
+Each path's ITU-R P.838-3 coefficients are computed once: a rain sample then costs one
+exponential per path, attenuation = k * R**alpha * path length.
+A rain series is either one gauge shared by all paths, or one column per path.
+
+    acc = availability(Path("gauge.npy"), read_links(Path("links.csv")), "v", elevation=5)
+    write_links(Path("availability.csv"), acc.columns())
+"""
+
+from pathlib import Path
+from typing import Iterator
+import itertools
+
+import numpy as np
+
+from .impairments import _rain_coeff
+from .linkbudget import budget
+
+CHUNK = 4096  # rain samples per pass
+# fade duration histogram bin edges [minutes]
+FADE_BINS = (0.0, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 360.0, np.inf)
+
+
+def read_rain(fn: Path, chunk: int = CHUNK, columns: int = 1) -> Iterator[np.ndarray]:
+    """
+    yield consecutive chunks of a rain-rate series [mm/hour] of shape (samples,)
+    or (samples, columns)
+
+    fn: .npy (memory-mapped), .csv / .txt (one row per sample, optional header row),
+      or else raw float32 samples with "columns" interleaved values per row
+    """
+    fn = Path(fn).expanduser()
+
+    if fn.suffix in (".csv", ".txt"):
+        with fn.open() as f:
+            first = f.readline()
+            lines: Iterator[str] = itertools.chain([first], f)
+            try:
+                np.array(first.split(","), float)
+            except ValueError:  # header
+                lines = f
+            while True:
+                block = list(itertools.islice(lines, chunk))
+                if not block:
+                    return
+                x = np.loadtxt(block, delimiter=",", ndmin=2)
+                yield x[:, 0] if x.shape[1] == 1 else x
+        return
+
+    if fn.suffix == ".npy":
+        data = np.load(fn, mmap_mode="r")
+    else:
+        data = np.memmap(fn, np.float32, "r")
+        data = data[: data.size - data.size % columns]
+        if columns > 1:
+            data = data.reshape(-1, columns)
+
+    for i in range(0, data.shape[0], chunk):
+        yield np.array(data[i : i + chunk], dtype=float)
+
+
+class Availability:
+    def __init__(
+        self,
+        table: dict,
+        polarization="v",
+        elevation=0.0,
+        dt: float = 1.0,
+        bins=FADE_BINS,
+        threshold: float = 0.0,
+    ):
+        """
+        table: link table, see radioutils.linkbudget.budget. An optional "rain_km" column
+          gives the path length in rain [km], else the whole range is.
+        polarization, elevation: as in rain_attenuation, one value or one per path
+        dt: rain sample interval [minutes]
+        bins: fade duration histogram bin edges [minutes]
+        threshold: margin [dB] below which a link is out
+        """
+        self.margin0 = budget(table)["margin_db"].astype(float)
+        n = self.margin0.size
+
+        a, k = _rain_coeff(table["freq_hz"], polarization, elevation)
+        km = table.get("rain_km", np.asarray(table["range_m"]) / 1e3)
+        self.alpha = np.broadcast_to(a, (n,)).copy()
+        self.k = np.broadcast_to(k * km, (n,)).copy()  # [dB / (mm/hour)**alpha]
+
+        self.dt = dt
+        self.bins = np.asarray(bins, float)
+        self.threshold = threshold
+
+        self.samples = np.zeros(n, np.int64)  # valid (not NaN) rain samples
+        self.outage = np.zeros(n, np.int64)  # samples below threshold
+        self.worst = np.full(n, np.inf)  # lowest margin [dB]
+        self.run = np.zeros(n, np.int64)  # samples of the fade in progress at the chunk end
+        self.hist = np.zeros((n, self.bins.size - 1), np.int64)  # completed fades
+
+    def attenuation(self, rain) -> np.ndarray:
+        """rain attenuation [dB] (samples, paths) of rain rates (samples,) or (samples, paths)"""
+        rain = np.asarray(rain, float)
+        if rain.ndim == 1:
+            rain = rain[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # k R**alpha, zero for no rain
+            return self.k * np.exp(self.alpha * np.log(np.maximum(rain, 0.0)))
+
+    def update(self, rain) -> np.ndarray:
+        """
+        accumulate the statistics of the next chunk of rain rates;
+        returns its margin time series [dB] (samples, paths). NaN samples are not counted.
+        """
+        margin = self.margin0 - self.attenuation(rain)
+        valid = ~np.isnan(margin)
+        out = valid & (margin < self.threshold)
+
+        self.samples += valid.sum(axis=0)
+        self.outage += out.sum(axis=0)
+        self.worst = np.fmin(self.worst, np.nanmin(margin, axis=0, initial=np.inf))
+
+        self._fades(out)
+
+        return margin
+
+    def _fades(self, out):
+        """complete the fades ending in this chunk, carrying the one in progress"""
+        T = out.shape[0]
+        x = np.vstack([self.run > 0, out]).astype(np.int8)
+        d = np.diff(x, axis=0).T  # (paths, samples): 1 at fade starts, -1 after fade ends
+
+        sp, st = np.nonzero(d == 1)
+        ep, et = np.nonzero(d == -1)
+        # fades in progress from the previous chunk start before this one
+        carried = np.flatnonzero(self.run > 0)
+        sp = np.concatenate([carried, sp])
+        st = np.concatenate([-self.run[carried], st])
+        order = np.lexsort((st, sp))
+        sp, st = sp[order], st[order]
+
+        # the last start of paths still in a fade at the chunk end is open
+        still = out[-1] if T else self.run > 0
+        last = np.r_[sp[1:] != sp[:-1], True] if sp.size else np.zeros(0, bool)
+        open_ = last & still[sp]
+
+        self.run[:] = 0
+        self.run[sp[open_]] = T - st[open_]
+
+        # starts and ends alternate on each path, so the remaining starts pair with the ends
+        self._count(ep, et - st[~open_])
+
+    def _count(self, paths, durations):
+        nb = self.bins.size - 1
+        b = np.clip(np.searchsorted(self.bins, durations * self.dt, side="right") - 1, 0, nb - 1)
+        self.hist += np.bincount(paths * nb + b, minlength=self.hist.size).reshape(self.hist.shape)
+
+    @property
+    def fades(self) -> np.ndarray:
+        """fade duration histogram (paths, bins), including the fades still in progress"""
+        hist = self.hist.copy()
+        p = np.flatnonzero(self.run > 0)
+        nb = self.bins.size - 1
+        b = np.clip(np.searchsorted(self.bins, self.run[p] * self.dt, side="right") - 1, 0, nb - 1)
+        np.add.at(hist, (p, b), 1)
+
+        return hist
+
+    @property
+    def availability(self) -> np.ndarray:
+        """percentage of the valid time each link is up"""
+        with np.errstate(invalid="ignore"):
+            return 100 * (1 - self.outage / self.samples)
+
+    @property
+    def outage_minutes(self) -> np.ndarray:
+        return self.outage * self.dt
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """per-path statistics as link table columns, see radioutils.linkbudget.write_links"""
+        return {
+            "availability_pct": self.availability,
+            "outage_min": self.outage_minutes,
+            "fades": self.fades.sum(axis=1),
+            "worst_margin_db": self.worst,
+        }
+
+
+def availability(
+    src,
+    table: dict,
+    polarization="v",
+    elevation=0.0,
+    dt: float = 1.0,
+    chunk: int = CHUNK,
+    columns: int = 1,
+    **kwargs,
+) -> Availability:
+    """
+    availability statistics of a link table over a whole rain-rate record
+
+    src: Path of a rain series (see read_rain), or iterable of rain-rate chunks
+    dt: rain sample interval [minutes]
+    columns: rain values per row of a raw float32 file
+    kwargs: bins, threshold as in Availability
+    """
+    acc = Availability(table, polarization, elevation, dt, **kwargs)
+
+    if isinstance(src, (str, Path)):
+        src = read_rain(Path(src), chunk, columns)
+    for rain in src:
+        acc.update(rain)
+
+    return acc
@@ -0,0 +1,209 @@
+"""
+Batch demodulation of many capture files
+
+Jobs come from glob patterns, or from a CSV manifest with a header row and columns
+"fn" (required), "fs", "fc", "mode" and "dtype" (blank or missing columns take the defaults):
+
+    fn,fs,fc,mode,dtype
+    night1/cap.cu8,2.4e6,-200e3,fm,
+    night1/beacon.bin,240e3,20e3,am,cs16
+
+A job without a dtype reads the sample format from the capture's SigMF sidecar or file suffix,
+as radioutils.loadbin does.
+
+Each job demodulates with am_demod / fm_demod / ssb_demod (causal, the capture memory-mapped)
+and writes WAV or NPY audio to an output directory, via a temporary file renamed when complete.
+Outputs keep the captures' paths relative to the glob's directory or the manifest's directory,
+and their full names, e.g. night1/cap.cu8 -> outdir/night1/cap.cu8.wav, so that captures of the
+same name in different directories or formats do not share an output.
+Jobs whose output already exists are skipped, so an interrupted batch resumes where it stopped.
+scripts/batch_demod.py is the command line front end.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, NamedTuple
+import csv
+import glob
+import logging
+import os
+import time
+
+import numpy as np
+
+from . import _openbin, am_demod, fm_demod, ssb_demod, sigmf_meta
+
+DEMODS: dict[str, Callable] = {"am": am_demod, "fm": fm_demod, "ssb": ssb_demod}
+
+
+class Job(NamedTuple):
+    fn: Path
+    fs: float | None  # None: from the SigMF sidecar
+    fc: float | None
+    mode: str
+    out: Path
+    dtype: str | None = None  # None: from the SigMF sidecar or file suffix
+
+
+class Result(NamedTuple):
+    fn: Path
+    status: str  # "ok", "skipped" or "failed"
+    samples: int  # input samples demodulated
+    seconds: float
+    message: str = ""
+
+
+def _float(v: str | None, default: float | None) -> float | None:
+    return default if v is None or not v.strip() else float(v)
+
+
+def make_jobs(
+    sources: list,
+    outdir: Path,
+    fs: float | None = None,
+    fc: float | None = None,
+    mode: str = "fm",
+    fmt: str = "wav",
+    dtype: str | None = None,
+) -> list[Job]:
+    """
+    jobs for glob patterns and/or .csv manifests in "sources"
+
+    fs, fc, mode, dtype: defaults for files not setting them in a manifest
+    fmt: output format "wav" or "npy"
+    """
+    if fmt not in ("wav", "npy"):
+        raise ValueError(f"unknown output format {fmt}")
+
+    outdir = Path(outdir).expanduser()
+
+    def output(fn: Path, root: Path) -> Path:
+        try:
+            rel = fn.relative_to(root)
+        except ValueError:  # outside the root: the whole path, under outdir
+            rel = fn.relative_to(fn.anchor)
+        return outdir / rel.with_name(f"{rel.name}.{fmt}")
+
+    jobs = []
+    for src in sources:
+        src = Path(src).expanduser()
+        if src.suffix == ".csv":
+            with src.open(newline="") as f:
+                for row in csv.DictReader(f):
+                    fn = Path(row["fn"]).expanduser()
+                    if not fn.is_absolute():
+                        fn = src.parent / fn
+                    jobs.append(
+                        Job(
+                            fn,
+                            _float(row.get("fs"), fs),
+                            _float(row.get("fc"), fc),
+                            (row.get("mode") or mode).strip(),
+                            output(fn, src.parent),
+                            (row.get("dtype") or "").strip() or dtype,
+                        )
+                    )
+        else:
+            root = _glob_root(src)
+            for name in sorted(glob.glob(str(src))):
+                if name.endswith(".sigmf-meta"):
+                    continue
+                jobs.append(Job(Path(name), fs, fc, mode, output(Path(name), root), dtype))
+
+    seen: dict[Path, Path] = {}
+    for job in jobs:
+        if job.out in seen:
+            raise ValueError(f"{seen[job.out]} and {job.fn} would both be written to {job.out}")
+        seen[job.out] = job.fn
+
+    return jobs
+
+
+def _glob_root(pattern: Path) -> Path:
+    """the directory of a glob pattern before its first wildcard"""
+    parts = pattern.parts
+    for i, part in enumerate(parts):
+        if glob.has_magic(part):
+            return Path(*parts[:i]) if i else Path()
+
+    return pattern.parent
+
+
+def run_job(job: Job, fsaudio: int, **kwargs) -> Result:
+    """
+    demodulate one capture, unless its output exists. Errors are returned, not raised,
+    so one bad capture does not stop a batch.
+
+    kwargs: passed to the demodulator
+    """
+    if job.out.is_file():
+        return Result(job.fn, "skipped", 0, 0.0)
+
+    tic = time.perf_counter()
+    try:
+        raw, _ = _openbin(job.fn, job.fs, None, None, True, job.dtype)
+        fs = job.fs if job.fs is not None else sigmf_meta(job.fn)["fs"]
+        demod = DEMODS[job.mode]
+        audio = demod(job.fn, fs, fsaudio, job.fc, causal=True, dtype=job.dtype, **kwargs)
+        write_audio(job.out, audio, fsaudio)
+    except Exception as e:
+        logging.error(f"{job.fn}: {e}")
+        return Result(job.fn, "failed", 0, time.perf_counter() - tic, f"{type(e).__name__}: {e}")
+
+    return Result(job.fn, "ok", raw.size // 2, time.perf_counter() - tic)
+
+
+def write_audio(fn: Path, audio, fsaudio: int):
+    """
+    WAV (float32, complex as two channels I, Q) or NPY, written to a temporary file first
+    so that "fn" only ever exists complete
+    """
+    fn.parent.mkdir(parents=True, exist_ok=True)
+    tmp = fn.with_name(f".{fn.stem}.{os.getpid()}.tmp{fn.suffix}")
+
+    if fn.suffix == ".npy":
+        np.save(tmp, audio)
+    else:
+        import scipy.io.wavfile
+
+        if np.iscomplexobj(audio):
+            audio = np.column_stack((audio.real, audio.imag))
+        scipy.io.wavfile.write(tmp, int(fsaudio), audio.astype(np.float32))
+
+    os.replace(tmp, fn)
+
+
+def run(jobs: list[Job], fsaudio: int, workers: int | None = None, **kwargs) -> list[Result]:
+    """
+    run jobs, on a pool of "workers" processes if given, returning results in job order
+    """
+    if workers is None:
+        return [run_job(job, fsaudio, **kwargs) for job in jobs]
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(run_job, job, fsaudio, **kwargs) for job in jobs]
+        return [f.result() for f in futures]
+
+
+def summary(results: list[Result], wall: float | None = None) -> str:
+    """
+    table of per-file status and throughput, with totals
+
+    wall: elapsed time of the whole batch [s]
+    """
+    lines = [f"{'file':40s} {'status':8s} {'seconds':>8s} {'Msamp/s':>8s}  message"]
+    for r in results:
+        rate = f"{r.samples / r.seconds / 1e6:8.2f}" if r.samples and r.seconds else f"{'':8s}"
+        lines.append(f"{r.fn.name:40s} {r.status:8s} {r.seconds:8.2f} {rate}  {r.message}")
+
+    n = {s: sum(r.status == s for r in results) for s in ("ok", "skipped", "failed")}
+    seconds = sum(r.seconds for r in results)
+    samples = sum(r.samples for r in results)
+    lines.append(
+        f"{len(results)} files: {n['ok']} ok, {n['skipped']} skipped, {n['failed']} failed;"
+        f" {samples / 1e6:.1f} Msamples in {seconds:.1f} job-seconds"
+    )
+    if wall:
+        lines.append(f"elapsed {wall:.1f} s, {samples / wall / 1e6:.2f} Msamples/s overall")
+
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+"""
+Free space coverage maps of many transmitters
+
+For every cell of an x-y grid, the best server (the transmitter received strongest) and
+its RSSI [dBm] as dist2rssi gives it. The grid is processed in square tiles of TILE cells a
+side, each keeping a running max / argmax across transmitters, so memory is bounded by the
+tile whatever the grid and transmitter counts. Tiles run on an optional process pool, and
+the maps can be .npy files written in place through memory maps, for grids larger than RAM:
+
+    rssi, server = coverage_map(
+        np.arange(0, 50e3, 5.0), np.arange(0, 20e3, 5.0), tx_x, tx_y, tx_dbm=30,
+        freq_hz=900e6, workers=32, rssi_fn=Path("rssi.npy"), server_fn=Path("server.npy"),
+    )
+
+Free space RSSI is the RSSI at 1 meter less 10 log10(distance**2), so transmitters are
+compared on linear power / distance**2: one division per cell per transmitter, and one
+logarithm per cell for the winner.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import functools
+import itertools
+
+import numpy as np
+
+from .distrssi import dist2rssi
+
+TILE = 512  # cells per tile side
+DMIN = 1.0  # [m] distances are clamped to this, Friis being a far-field model
+
+
+def coverage_map(
+    x,
+    y,
+    tx_x,
+    tx_y,
+    tx_dbm=-14.0,
+    freq_hz=2450e6,
+    height=0.0,
+    tile: int = TILE,
+    workers: int | None = None,
+    rssi_fn: Path | None = None,
+    server_fn: Path | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    best server and free space RSSI maps over the grid of cell centers x (columns) by y (rows)
+
+    x, y: 1-D cell coordinates [m]
+    tx_x, tx_y: transmitter positions [m]
+    tx_dbm: conducted transmit power [dBm], scalar or per transmitter, as dist2rssi "notionaltx"
+    freq_hz: frequency [Hz], scalar or per transmitter
+    height: transmitter height above the receivers [m], scalar or per transmitter
+    tile: cells per tile side
+    workers: number of processes, None to compute the tiles in this process
+    rssi_fn, server_fn: write the maps to these .npy files, returned as memory maps
+
+    returns float32 RSSI [dBm] and int32 index of the best transmitter, both of shape (y, x)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    tx_x, tx_y, h = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (tx_x, tx_y, height))
+    )
+    if x.ndim != 1 or y.ndim != 1 or tx_x.ndim != 1:
+        raise ValueError("grid and transmitter coordinates must be 1-D")
+    # linear RSSI at 1 meter [mW], broadcast per transmitter
+    p1 = 10 ** (np.broadcast_to(dist2rssi(1.0, tx_dbm, freq_hz), tx_x.shape) / 10)
+    txs = np.column_stack([tx_x, tx_y, h**2, p1])
+
+    shape = (y.size, x.size)
+    rssi = _raster(rssi_fn, shape, np.float32)
+    server = _raster(server_fn, shape, np.int32)
+
+    tiles = list(itertools.product(range(0, y.size, tile), range(0, x.size, tile)))
+    rows = [y[r : r + tile] for r, _ in tiles]
+    cols = [x[c : c + tile] for _, c in tiles]
+
+    if workers is None:
+        for (r, c), yt, xt in zip(tiles, rows, cols):
+            _place(rssi, server, r, c, *_tile(txs, yt, xt))
+    elif rssi_fn is not None and server_fn is not None:
+        # the workers write their tiles into the memory maps, nothing is sent back
+        run = functools.partial(_tile_to, Path(rssi_fn), Path(server_fn), txs)
+        with ProcessPoolExecutor(workers) as pool:
+            list(pool.map(run, *zip(*tiles), rows, cols, chunksize=_chunksize(tiles, workers)))
+    else:
+        run = functools.partial(_tile, txs)
+        with ProcessPoolExecutor(workers) as pool:
+            results = pool.map(run, rows, cols, chunksize=_chunksize(tiles, workers))
+            for (r, c), res in zip(tiles, results):
+                _place(rssi, server, r, c, *res)
+
+    for m in (rssi, server):
+        if isinstance(m, np.memmap):
+            m.flush()
+
+    return rssi, server
+
+
+def _raster(fn: Path | None, shape: tuple[int, int], dtype) -> np.ndarray:
+    if fn is None:
+        return np.empty(shape, dtype)
+
+    return np.lib.format.open_memmap(Path(fn).expanduser(), "w+", dtype, shape)
+
+
+def _chunksize(tiles: list, workers: int) -> int:
+    return max(1, len(tiles) // (4 * workers))
+
+
+def _place(rssi, server, r: int, c: int, p: np.ndarray, best: np.ndarray):
+    rssi[r : r + p.shape[0], c : c + p.shape[1]] = p
+    server[r : r + p.shape[0], c : c + p.shape[1]] = best
+
+
+def _tile_to(rssi_fn: Path, server_fn: Path, txs: np.ndarray, r: int, c: int, y, x):
+    """compute a tile and write it into the .npy maps"""
+    rssi = np.load(rssi_fn.expanduser(), mmap_mode="r+")
+    server = np.load(server_fn.expanduser(), mmap_mode="r+")
+    _place(rssi, server, r, c, *_tile(txs, y, x))
+    rssi.flush()
+    server.flush()
+
+
+def _tile(txs: np.ndarray, y: np.ndarray, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    RSSI [dBm] and best transmitter of the cells y x x
+
+    txs: rows of transmitter x, y, height**2 and linear RSSI at 1 meter
+    """
+    dx2 = np.empty((1, x.size))
+    dy2 = np.empty((y.size, 1))
+    d2 = np.empty((y.size, x.size))
+    p = np.empty_like(d2)
+
+    best = np.zeros_like(d2)
+    server = np.zeros(d2.shape, np.int32)
+    better = np.empty(d2.shape, bool)
+
+    for i, (tx, ty, h2, p1) in enumerate(txs):
+        np.square(x - tx, out=dx2[0])
+        np.square(y - ty, out=dy2[:, 0])
+        np.add(dx2, dy2, out=d2)
+        d2 += h2
+        np.maximum(d2, DMIN**2, out=d2)
+
+        np.divide(p1, d2, out=p)
+        np.greater(p, best, out=better)
+        np.copyto(best, p, where=better)
+        np.copyto(server, i, where=better)
+
+    with np.errstate(divide="ignore"):
+        rssi = (10 * np.log10(best)).astype(np.float32)
+
+    return rssi, server
@@ -0,0 +1,61 @@
+"""
+Fused digital down-converter (DDC)
+
+Frequency translation by the NCO and the first (input rate) decimation stage run together
+on cache-sized sub-blocks, and the later stages once per call on the decimated samples:
+no full-rate translated or filtered array is ever materialized.
+The output equals freq_translate followed by the causal downsample
+(or the multistage plan for a given passband), and state is carried across calls.
+Signals are processed along their last axis, with one translation frequency per row if fc
+is an array.
+"""
+
+import math
+
+import numpy as np
+
+from .multistage import decimator_stages
+from .nco import NCO
+
+
+class DDC:
+    CHUNK = 2**14  # input samples per pass
+
+    def __init__(self, fc: float | None, fs: float, fsout: float, fpass: float | None = None):
+        """
+        fc: translation frequency [Hz], or array of frequencies of each row, as for freq_translate
+        fs: input sampling frequency [Hz]
+        fsout: output sampling frequency [Hz]
+        fpass: passband edge [Hz] to decimate through the cheapest multistage plan
+        """
+        self.nco = None if fc is None else NCO(fc, fs)
+        self.stages = decimator_stages(fs, fsout, fpass)
+        self.buf: np.ndarray | None = None
+
+    def __call__(self, x):
+        shape = x.shape[:-1] + (self.CHUNK,)
+        if self.buf is None or self.buf.dtype != x.dtype or self.buf.shape != shape:
+            self.buf = np.empty(shape, x.dtype)
+
+        out = []
+        for i in range(0, x.shape[-1], self.CHUNK):
+            y = x[..., i : i + self.CHUNK]
+            if self.nco is not None:
+                y = self.nco.mix(y, self.buf[..., : y.shape[-1]])
+            y = self.stages[0](y)
+            out.append(y.copy() if np.shares_memory(y, self.buf) else y)
+        if not out:
+            return x[..., :0]
+
+        y = np.concatenate(out, axis=-1)
+        for stage in self.stages[1:]:  # decimated rate: once per call
+            y = stage(y)
+        return y
+
+
+def if_rate(fs: int, fsaudio: int, bandwidth: float) -> int:
+    """
+    lowest integer multiple of fsaudio at least "bandwidth" [Hz], but no more than fs:
+    the intermediate rate to down-convert wideband signals (e.g. FM) to before demodulation
+    """
+    return int(min(fs, fsaudio * math.ceil(bandwidth / fsaudio)))
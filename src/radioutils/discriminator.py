@@ -0,0 +1,140 @@
+"""
+FM discriminator kernels
+
+The instantaneous frequency of x is the phase step angle(x[n] * conj(x[n-1])).
+That is the same as diff(unwrap(angle(x))), but needs only the previous sample,
+so it runs block by block, and in the precision of x (float32 for complex64 captures).
+The kernels work on cache-sized chunks with one reused scratch buffer.
+Signals are demodulated along their last axis, e.g. all rows of a (n_channels, n_samples) array.
+
+methods:
+    "conj": arctan2 of the conjugate product
+    "fast": 9th order polynomial arctan2 approximation, max error about 1e-5 radian.
+        NumPy's SIMD float32 arctan2 is usually faster; this is for platforms where it is not.
+    "unwrap": the original diff(unwrap(angle(x))) in float64, for reference
+"""
+
+import numpy as np
+
+from .workspace import Workspace
+
+CHUNK = 2**14  # samples per pass
+
+# odd polynomial coefficients of arctan(a), 0 <= a <= 1
+ATAN_COEFFS = (0.9998660, -0.3302995, 0.1801410, -0.0851330, 0.0208351)
+
+
+def discriminate(
+    x,
+    Cfm: float,
+    prev=None,
+    method: str = "conj",
+    out=None,
+    workspace: Workspace | None = None,
+):
+    """
+    Cfm * phase step of each sample of x, along its last axis
+
+    prev: sample(s) preceding x[..., 0], e.g. the last sample(s) of the previous block.
+      Without it the output has one sample less than x.
+    out: optional output array
+    workspace: Workspace to take the chunk scratch buffer from
+    """
+    N = x.shape[-1]
+    if method == "unwrap":
+        if prev is not None:
+            x = np.concatenate((np.broadcast_to(prev, x.shape[:-1])[..., None], x), axis=-1)
+        d = Cfm * np.diff(np.unwrap(np.angle(x.astype(np.complex128))), axis=-1)
+        if out is None:
+            return d
+        out[:] = d
+        return out
+
+    if method not in ("conj", "fast"):
+        raise ValueError(f"unknown discriminator method {method}")
+
+    n = N - (prev is None) if N else 0
+    if out is None:
+        out = np.empty(x.shape[:-1] + (n,), np.finfo(x.dtype).dtype)
+    if n == 0:
+        return out
+
+    i0 = 0
+    if prev is not None:
+        old = np.broadcast_to(np.asarray(prev, x.dtype), x.shape[:-1])[..., None]
+        _phase_step(x[..., :1], old, out[..., :1], method)
+        i0 = 1
+
+    shape = x.shape[:-1] + (min(CHUNK, n),)
+    if workspace is None:
+        c = np.empty(shape, x.dtype)
+    else:
+        c = workspace.buffer("discriminate_product", shape, x.dtype)
+    for i in range(0, N - 1, CHUNK):
+        m = min(CHUNK, N - 1 - i)
+        cur = x[..., i + 1 : i + 1 + m]
+        _phase_step(cur, x[..., i : i + m], out[..., i0 + i : i0 + i + m], method, c[..., :m])
+
+    out *= Cfm
+
+    return out
+
+
+def _phase_step(cur, old, out, method: str, c=None):
+    if c is None:
+        c = np.empty(cur.shape, cur.dtype)
+
+    np.conjugate(old, out=c)
+    np.multiply(cur, c, out=c)
+
+    if method == "fast":
+        atan2_poly(c.imag, c.real, out)
+    else:
+        np.arctan2(c.imag, c.real, out=out)
+
+
+def atan2_poly(y, x, out):
+    """
+    polynomial approximation of arctan2(y, x), written into out
+    """
+    t = np.empty_like(out)
+    a = np.empty_like(out)
+
+    np.abs(y, out=out)
+    np.abs(x, out=t)
+    swap = out > t
+    # a = min(|x|, |y|) / max(|x|, |y|) in [0, 1]
+    np.minimum(out, t, out=a)
+    np.maximum(out, t, out=t)
+    np.divide(a, t, out=a, where=t > 0)
+
+    np.multiply(a, a, out=t)
+    out[:] = ATAN_COEFFS[-1]
+    for c in ATAN_COEFFS[-2::-1]:
+        out *= t
+        out += c
+    out *= a
+
+    np.subtract(np.pi / 2, out, out=out, where=swap)
+    np.subtract(np.pi, out, out=out, where=x < 0)
+    np.negative(out, out=out, where=y < 0)
+
+    return out
+
+
+class Discriminator:
+    """
+    streaming FM discriminator Cfm * angle(x[n] conj(x[n-1])), carrying the previous sample
+    """
+
+    def __init__(self, Cfm: float, method: str = "conj"):
+        self.Cfm = Cfm
+        self.method = method
+        self.prev = None
+
+    def __call__(self, x):
+        y = discriminate(x, self.Cfm, self.prev, self.method)
+        if x.shape[-1]:
+            self.prev = x[..., -1].copy()
+
+        return y
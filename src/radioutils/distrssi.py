@@ -11,11 +11,14 @@ dist2rssi: Assuming only free space (no reflections) propagation, what would RSS
   for a given reference Bluetooth Low Energy transmitter power measurement (dBm) power output in 50 ohms.
 rssi2dist: given a reference transmitter power at 1 meter and the measured RSSI, and assuming
   free space propagation (no reflections), what must the distance between TX-RX be?
+multilaterate: positions of many tags at once from their RSSI reports of fixed beacons
 
 """
 
 from warnings import warn
 
+import numpy as np
+
 from . import Link
 
 
@@ -31,6 +34,71 @@ def rssi2dist(ctx, rssi, rexp=2):
     ctx = transmitter EIRP [dBm] received at 1 meter (reference quantity)
     rssi: currently received signal strength [dBm]
     """
-    if ctx > 0:
+    if np.any(np.asarray(ctx) > 0):
         warn("does your BLE transmitter really give {} dBm at one meter distance?".format(ctx))
     return (10 ** ((ctx - rssi) / 10)) ** (1 / rexp)
+
+
+def multilaterate(tag, beacon, rssi, ctx, rexp=2, iterations: int = 5):
+    """positions of all tags at once from their RSSI reports
+
+    tag: tag ID of each report, (reports,)
+    beacon: position of the reporting beacon [m], (reports, 2) or (reports, 3)
+    rssi: received signal strength [dBm] of each report
+    ctx, rexp: as in rssi2dist, scalars or one per report
+
+    Each tag's position is first the linearized least squares solution of
+    |position - beacon|**2 = distance**2 relative to the centroid of its beacons,
+    then refined by "iterations" damped Gauss-Newton steps on the distance residuals.
+    All tags are solved together: the normal equations are summed per tag with np.bincount
+    and solved as a stack of small systems.
+    Tags with too few beacons for a fix tend to the centroid of their beacons.
+
+    returns the unique tags (sorted) and their positions [m], (tags, 2) or (tags, 3)
+    """
+    tags, g = np.unique(tag, return_inverse=True)
+    b = np.asarray(beacon, dtype=float)
+    if b.ndim != 2 or b.shape[0] != g.size:
+        raise ValueError("beacon must be (reports, dimensions), one row per report")
+    r = np.broadcast_to(rssi2dist(ctx, np.asarray(rssi, dtype=float), rexp), g.shape)
+
+    n = np.bincount(g, minlength=tags.size)
+
+    def tagsum(x):
+        """sum of x per tag: (reports, ...) -> (tags, ...)"""
+        cols = x.reshape(g.size, -1).T
+        s = [np.bincount(g, weights=w, minlength=tags.size) for w in cols]
+        return np.stack(s, axis=-1).reshape((tags.size,) + x.shape[1:])
+
+    def mean(x):
+        return tagsum(x) / n.reshape((-1,) + (1,) * (x.ndim - 1))
+
+    # beacons relative to their tag's centroid, for conditioning
+    centroid = mean(b)
+    c = b - centroid[g]
+    c2 = (c**2).sum(axis=1)
+
+    # %% linearized: |q|**2 - 2 c.q + |c|**2 = r**2, less its tag mean (c sums to 0)
+    A = -2 * c
+    y = r**2 - c2
+    y = y - mean(y)[g]
+    q = _solve(tagsum(A[:, :, None] * A[:, None, :]), tagsum(A * y[:, None]))
+
+    # %% Gauss-Newton refinement of |q - c| - r
+    for _ in range(iterations):
+        d = q[g] - c
+        dist = np.maximum(np.linalg.norm(d, axis=1), 1e-9)
+        J = d / dist[:, None]
+        e = r - dist
+        q = q + _solve(tagsum(J[:, :, None] * J[:, None, :]), tagsum(J * e[:, None]), 1e-3)
+
+    return tags, centroid + q
+
+
+def _solve(N, v, damping: float = 1e-9):
+    """stack of normal equations N x = v, damped by a fraction of their scale"""
+    d = N.shape[-1]
+    scale = np.trace(N, axis1=1, axis2=2) / d
+    N = N + (damping * scale + 1e-12)[:, None, None] * np.eye(d)
+
+    return np.linalg.solve(N, v[..., None])[..., 0]
@@ -0,0 +1,138 @@
+"""
+Cache of FIR filter designs
+
+lpf_design, hpf_design and bpf_design are memoized on their arguments in a bounded LRU cache,
+so batch runs with identical parameters design each filter once.
+Optionally, designs are also persisted as .npy tap banks in a directory, shared across runs
+and processes. Set the directory with configure(path=...) or the environment variable
+RADIOUTILS_FILTER_CACHE.
+
+Cached coefficients are returned read-only since they are shared between callers.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import threading
+
+import numpy as np
+
+
+class FilterCache:
+    def __init__(self, maxsize: int = 128, path: Path | None = None):
+        """
+        maxsize: number of designs kept in memory
+        path: optional directory of persistent designs
+        """
+        self.maxsize = maxsize
+        self.path = None if path is None else Path(path).expanduser()
+        self.hits = 0
+        self.misses = 0
+        self._designs: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, design):
+        """
+        coefficients for "key", calling design() only if neither memory nor disk has them
+        """
+        with self._lock:
+            b = self._designs.get(key)
+            if b is not None:
+                self._designs.move_to_end(key)
+                self.hits += 1
+                return b
+
+        b = self._load(key)
+        if b is None:
+            self.misses += 1
+            b = np.asarray(design())
+            self._save(key, b)
+        else:
+            self.hits += 1
+
+        b.setflags(write=False)
+
+        with self._lock:
+            self._designs[key] = b
+            while len(self._designs) > self.maxsize:
+                self._designs.popitem(last=False)
+
+        return b
+
+    def clear(self):
+        with self._lock:
+            self._designs.clear()
+            self.hits = self.misses = 0
+
+    def _file(self, key: tuple) -> Path | None:
+        if self.path is None:
+            return None
+
+        h = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return self.path / f"{key[0]}-{h}.npy"
+
+    def _load(self, key: tuple):
+        fn = self._file(key)
+        if fn is None or not fn.is_file():
+            return None
+
+        try:
+            return np.load(fn)
+        except (OSError, ValueError) as e:
+            logging.warning(f"ignoring unreadable filter cache {fn}: {e}")
+            return None
+
+    def _save(self, key: tuple, b):
+        fn = self._file(key)
+        if fn is None:
+            return
+
+        fn.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename, so concurrent processes never read a partial file
+        tmp = fn.with_name(f"{fn.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+        np.save(tmp, b)
+        os.replace(tmp, fn)
+
+
+_env = os.environ.get("RADIOUTILS_FILTER_CACHE")
+CACHE = FilterCache(path=Path(_env) if _env else None)
+
+
+def configure(maxsize: int | None = None, path: Path | None = None):
+    """
+    change the size of the in-memory cache, and/or the directory of persistent designs
+    """
+    if maxsize is not None:
+        CACHE.maxsize = maxsize
+    if path is not None:
+        CACHE.path = Path(path).expanduser()
+
+
+def _key_value(v):
+    if isinstance(v, (int, float, np.number)) and not isinstance(v, bool):
+        return float(v)
+    if isinstance(v, (list, tuple, np.ndarray)):
+        return tuple(_key_value(x) for x in v)
+
+    return v
+
+
+def cached(func):
+    """
+    memoize a filter designer in CACHE, keyed on its name and all its (default-filled) arguments
+    """
+    sig = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + tuple((k, _key_value(v)) for k, v in bound.arguments.items())
+
+        return CACHE.get(key, lambda: func(*args, **kwargs))
+
+    return wrapper
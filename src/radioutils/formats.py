@@ -0,0 +1,142 @@
+"""
+IQ sample formats of common SDR captures, and SigMF metadata
+
+    cu8:  RTL-SDR interleaved unsigned 8-bit I/Q
+    cs8:  HackRF interleaved signed 8-bit I/Q  (SigMF "ci8")
+    cs16: interleaved signed 16-bit I/Q  (SigMF "ci16_le")
+    cf32: GNU Radio complex64  (SigMF "cf32_le")
+    cf64: complex128  (SigMF "cf64_le")
+
+A capture's format is an explicit dtype, else the datatype of its SigMF sidecar, else given by
+its file suffix (.cu8, .cs8, .cs16, .cf32 or .cfile, .cf64), else cf32.
+
+Integer samples are scaled to +/- 1.0 complex64 in cache-sized chunks,
+without any float64 intermediate arrays.
+
+https://github.com/sigmf/SigMF/blob/main/sigmf-spec.md
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+import json
+
+import numpy as np
+
+CHUNK = 2**16  # I/Q values converted per pass
+
+
+class IQFormat(NamedTuple):
+    raw: np.dtype  # dtype of each I or Q value on disk
+    offset: float  # value representing zero
+    scale: float  # full scale
+
+    @property
+    def itemsize(self) -> int:
+        """bytes per complex sample"""
+        return 2 * self.raw.itemsize
+
+    @property
+    def cdtype(self) -> np.dtype:
+        """complex dtype of converted samples"""
+        return np.dtype(np.complex128 if self.raw.itemsize == 8 else np.complex64)
+
+
+ALIASES = {"cs8": "ci8", "cs16": "ci16_le", "cf32": "cf32_le", "cf64": "cf64_le"}
+# formats of captures without a sidecar, by file suffix
+SUFFIXES = {
+    ".cu8": "cu8",
+    ".cs8": "cs8",
+    ".cs16": "cs16",
+    ".cf32": "cf32",
+    ".cfile": "cf32",
+    ".cf64": "cf64",
+}
+
+
+def iq_format(name: str) -> IQFormat:
+    """
+    name: "cu8", "cs8", "cs16", "cf32", "cf64" or a complex SigMF datatype e.g. "ci16_be"
+    """
+    name = ALIASES.get(name.lower(), name.lower())
+
+    if not name.startswith("c") or name[1] not in "fiu":
+        raise ValueError(f"unsupported IQ sample format {name}")
+
+    kind, base = name[1], name[2:]
+    bits, _, endian = base.partition("_")
+    if endian not in ("", "le", "be"):
+        raise ValueError(f"unsupported IQ sample format {name}")
+
+    raw = np.dtype(f"{'>' if endian == 'be' else '<'}{kind}{int(bits) // 8}")
+
+    if kind == "f":
+        return IQFormat(raw, 0.0, 1.0)
+    if kind == "u":
+        half = (2 ** int(bits) - 1) / 2
+        return IQFormat(raw, half, half)
+
+    return IQFormat(raw, 0.0, 2 ** (int(bits) - 1))
+
+
+def to_complex(raw, fmt: IQFormat, out=None):
+    """
+    convert interleaved I/Q values to complex samples.
+
+    Float formats are returned as a zero-copy complex view of raw.
+    Integer formats are scaled into complex64 "out" chunk by chunk.
+    """
+    if fmt.raw.kind == "f":
+        return raw.view(fmt.cdtype.newbyteorder(fmt.raw.byteorder))
+
+    if out is None:
+        out = np.empty(raw.size // 2, np.complex64)
+
+    f = out.view(np.float32)
+    for i in range(0, raw.size, CHUNK):
+        y = f[i : i + CHUNK]
+        np.multiply(raw[i : i + CHUNK], 1 / fmt.scale, out=y, dtype=np.float32)
+        if fmt.offset:
+            y -= fmt.offset / fmt.scale
+
+    return out
+
+
+def capture_format(fn: Path, dtype: str | None = None, meta: dict | None = None) -> str:
+    """
+    sample format of capture "fn": dtype if given, else the datatype of its SigMF sidecar,
+    else by its file suffix, else "cf32"
+
+    meta: sigmf_meta(fn), if already read
+    """
+    if dtype:
+        return dtype
+    if meta is None:
+        meta = sigmf_meta(fn)
+
+    return meta.get("dtype") or SUFFIXES.get(Path(fn).suffix.lower(), "cf32")
+
+
+def sigmf_meta(fn: Path) -> dict:
+    """
+    read sample format ("dtype"), sample rate ("fs") and RF center frequency ("center_freq")
+    from the SigMF sidecar of capture "fn". The demodulators' fc is a translation offset from
+    that center, e.g. fc = center_freq - station frequency to tune a station to baseband.
+
+    returns empty dict if there is no .sigmf-meta file
+    """
+    meta_fn = Path(fn).expanduser().with_suffix(".sigmf-meta")
+    if not meta_fn.is_file():
+        return {}
+
+    meta = json.loads(meta_fn.read_text())
+
+    glob = meta["global"]
+    info = {"dtype": glob["core:datatype"]}
+    if "core:sample_rate" in glob:
+        info["fs"] = glob["core:sample_rate"]
+
+    captures = meta.get("captures", [])
+    if captures and "core:frequency" in captures[0]:
+        info["center_freq"] = captures[0]["core:frequency"]
+
+    return info
@@ -0,0 +1,136 @@
+"""
+Link budgets of large link populations
+
+Links are columns of equal length (or scalars shared by all links), not one Link object each:
+range, frequency, TX power, RX sensitivity, antenna gains and extra losses, e.g. rain:
+
+    table = read_links(Path("links.csv"))
+    table["loss_db"] = rain_attenuation(table["freq_hz"], 25, "v", 30) * table["range_m"] / 1e3
+    result = budget(table)
+    write_links(Path("budget.npz"), table | columns(result))
+
+Free space path loss, received power and margin are computed in chunks of CHUNK links,
+so the temporaries stay in cache however many links there are, into a structured array
+of float32 fields (12 bytes per link).
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+C = 299792458.0  # [m/s]
+# 20 log10(4 pi / c): FSPL = 20 log10(range * freq) + FSPL0
+FSPL0 = 20 * np.log10(4 * np.pi / C)
+
+CHUNK = 2**16  # links per pass
+
+# link table columns: required, then optional ones defaulting to 0 dB
+FIELDS = ("range_m", "freq_hz", "tx_dbm", "rx_dbm", "tx_gain_dbi", "rx_gain_dbi", "loss_db")
+REQUIRED = FIELDS[:4]
+
+# result fields: "prx_dbm" (received power) is not "rx_dbm" (the RX sensitivity column),
+# so a table merged with its result can be budgeted again
+RESULT = np.dtype([("fspl_db", np.float32), ("prx_dbm", np.float32), ("margin_db", np.float32)])
+
+
+def link_budget(
+    range_m,
+    freq_hz,
+    tx_dbm,
+    rx_dbm,
+    tx_gain_dbi=0.0,
+    rx_gain_dbi=0.0,
+    loss_db=0.0,
+    chunk: int = CHUNK,
+) -> np.ndarray:
+    """
+    link budgets, each input a scalar or a column of one value per link
+
+    range_m: TX to RX distance [meters]
+    freq_hz: frequency [Hz]
+    tx_dbm: TX power [dBm]
+    rx_dbm: RX sensitivity [dBm]
+    tx_gain_dbi, rx_gain_dbi: antenna gains [dBi]
+    loss_db: other losses (cables, rain, ...) [dB]
+
+    returns RESULT structured array: free space path loss "fspl_db", received power "prx_dbm"
+    and "margin_db" above the RX sensitivity of each link
+    """
+    cols = [
+        np.asarray(x, dtype=float)
+        for x in (range_m, freq_hz, tx_dbm, rx_dbm, tx_gain_dbi, rx_gain_dbi, loss_db)
+    ]
+    sizes = {x.size for x in cols if x.ndim}
+    if len(sizes) > 1 or any(x.ndim > 1 for x in cols):
+        raise ValueError("link columns must be scalars or 1-D arrays of the same length")
+    n = sizes.pop() if sizes else 1
+
+    out = np.empty(n, RESULT)
+    for i in range(0, n, chunk):
+        r, f, tx, rx, gt, gr, loss = (x[i : i + chunk] if x.ndim else x for x in cols)
+
+        fspl = 20 * np.log10(r * f) + FSPL0
+        prx = tx + gt + gr - loss - fspl
+
+        y = out[i : i + chunk]
+        y["fspl_db"] = fspl
+        y["prx_dbm"] = prx
+        y["margin_db"] = prx - rx
+
+    return out
+
+
+def budget(table: dict, chunk: int = CHUNK) -> np.ndarray:
+    """
+    link_budget of a link table: dict of FIELDS columns, the optional ones defaulting to 0 dB.
+    Other columns (e.g. link IDs) are ignored.
+    """
+    missing = [k for k in REQUIRED if k not in table]
+    if missing:
+        raise ValueError(f"link table lacks columns {missing}")
+
+    return link_budget(**{k: table[k] for k in FIELDS if k in table}, chunk=chunk)
+
+
+def columns(result: np.ndarray) -> dict[str, np.ndarray]:
+    """structured array as a dict of columns"""
+    return {name: result[name] for name in result.dtype.names or ()}
+
+
+def read_links(fn: Path) -> dict[str, np.ndarray]:
+    """
+    numeric link table from a .npz file, or a .csv file with a header row of column names
+    """
+    fn = Path(fn).expanduser()
+
+    if fn.suffix == ".npz":
+        with np.load(fn) as f:
+            return dict(f)
+
+    with fn.open() as f:
+        names = [name.strip() for name in f.readline().split(",")]
+        data = np.loadtxt(f, delimiter=",", ndmin=2)
+
+    if not data.size:
+        return {name: np.empty(0) for name in names}
+    if data.shape[1] != len(names):
+        raise ValueError(f"{fn} has {data.shape[1]} columns but {len(names)} names")
+
+    return {name: data[:, i] for i, name in enumerate(names)}
+
+
+def write_links(fn: Path, table: dict | np.ndarray):
+    """
+    write a link table (dict of columns, or structured array e.g. a budget result)
+    to .npz, or else CSV with a header row
+    """
+    fn = Path(fn).expanduser()
+    if isinstance(table, np.ndarray):
+        table = columns(table)
+
+    if fn.suffix == ".npz":
+        np.savez(fn, **table)
+        return
+
+    data = np.column_stack([np.asarray(v, float) for v in table.values()])
+    np.savetxt(fn, data, fmt="%.10g", delimiter=",", header=",".join(table), comments="")
@@ -0,0 +1,71 @@
+"""
+Numerically controlled oscillator (NCO) for frequency translation
+
+The oscillator exp(j 2 pi fc t) is built from a precomputed complex64 table of one
+"tablesize" span of samples, rotated by a per-span phasor taken from a wrapped
+phase accumulator. That avoids full-length time vectors and per-sample transcendentals,
+and phase precision does not degrade however long the capture is.
+Span boundaries are counted from the first sample, so mixing a signal in one call or
+in blocks of any size gives identical results.
+An array of frequencies gives one oscillator per channel, mixing the rows of a
+(n_channels, n_samples) signal in one call.
+"""
+
+import numpy as np
+
+
+class NCO:
+    def __init__(
+        self, fc: float, fs: float, phase: float = 0.0, dtype=np.complex64, tablesize: int = 4096
+    ):
+        """
+        fc: oscillator frequency [Hz], or array of frequencies of each channel
+        fs: sampling frequency [Hz]
+        phase: initial phase [cycles]
+        """
+        self.fc = fc
+        self.fs = fs
+        self.step = np.asarray(fc) / fs  # [cycles/sample]
+        self.table = np.exp(2j * np.pi * self.step[..., None] * np.arange(tablesize)).astype(dtype)
+        self.reset(phase)
+
+    def reset(self, phase: float = 0.0):
+        """restart the oscillator at "phase" [cycles]"""
+        self.phase = (self.step * 0 + phase) % 1.0  # [cycles] at start of current table span
+        self.j = 0  # samples consumed of current table span
+        self._rotate()
+
+    def _rotate(self):
+        self.rot = np.exp(2j * np.pi * self.phase).astype(self.table.dtype)[..., None]
+
+    def mix(self, sig, out=None):
+        """
+        multiply sig by the next oscillator samples, along its last axis.
+        By default the product is written into sig.
+        """
+        if out is None:
+            out = sig
+
+        L = self.table.shape[-1]
+        N = sig.shape[-1]
+        i = 0
+        while i < N:
+            n = min(L - self.j, N - i)
+            y = out[..., i : i + n]
+            np.multiply(sig[..., i : i + n], self.table[..., self.j : self.j + n], out=y)
+            y *= self.rot
+
+            i += n
+            self.j += n
+            if self.j == L:
+                self.j = 0
+                self.phase = (self.phase + self.step * L) % 1.0
+                self._rotate()
+
+        return out
+
+    def __call__(self, n: int):
+        """
+        next n oscillator samples (of each channel)
+        """
+        return self.mix(np.ones(self.step.shape + (n,), self.table.dtype))
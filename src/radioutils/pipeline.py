@@ -0,0 +1,253 @@
+"""
+Threaded pipeline execution
+
+Reading, DSP and writing of a capture run in their own threads, connected by bounded queues:
+while one block is being filtered, the next is read from disk and the previous one written.
+NumPy and SciPy release the GIL in their array loops and FFTs, so the stages overlap.
+A full queue blocks its producer (backpressure), so at most "depth" blocks wait between
+two stages and memory stays bounded however fast the reader is.
+
+Per-stage statistics show the bottleneck: the busiest stage has the highest utilization,
+and the queue in front of it is the one that stays full.
+
+Example:
+
+    pipe = demod_pipeline(2.4e6, 48000, fc=-200e3, mode="fm")
+    with WavSink(Path("audio.wav"), 48000) as sink:
+        pipe.run(iterbin(Path("cap.cu8"), 2.4e6, readahead=4), sink)
+    print(pipe.report())
+"""
+
+from pathlib import Path
+from typing import Callable, Iterable
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .ddc import DDC
+from .fir import FirFilter
+from .stream import STAGES
+
+_END = object()  # end of stream marker
+
+
+class _Stopped(Exception):
+    """another stage failed"""
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0  # blocks processed
+        self.busy = 0.0  # [s] in the stage function
+        self.depth_sum = 0  # input queue length summed over items
+        self.depth_max = 0
+
+    @property
+    def depth(self) -> float:
+        """mean input queue length seen by this stage"""
+        return self.depth_sum / self.items if self.items else 0.0
+
+
+class Pipeline:
+    def __init__(self, stages: list[tuple[str, Callable]], depth: int = 4):
+        """
+        stages: (name, function) pairs, each function called on every block in order,
+          in its own thread
+        depth: maximum blocks queued in front of each stage
+        """
+        self.stages = stages
+        self.depth = depth
+        self.stats: list[StageStats] = []
+        self.elapsed = 0.0
+
+    def run(self, source: Iterable, sink: Callable | None = None) -> list | None:
+        """
+        feed the blocks of "source" (read in its own thread) through the stages into "sink"
+        (called in this thread). Without a sink the output blocks are returned.
+        The first exception in any stage stops the pipeline and is raised here.
+        """
+        names = ["read"] + [name for name, _ in self.stages] + ["sink"]
+        self.stats = [StageStats(n) for n in names]
+        queues: list[queue.Queue] = [queue.Queue(self.depth) for _ in range(len(self.stages) + 1)]
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+
+        out: list | None = None
+        if sink is None:
+            out = []
+            sink = out.append
+
+        threads = [threading.Thread(target=self._read, args=(source, queues[0]), daemon=True)]
+        for i, (_, func) in enumerate(self.stages):
+            args = (func, queues[i], queues[i + 1], self.stats[i + 1])
+            threads.append(threading.Thread(target=self._work, args=args, daemon=True))
+
+        tic = time.perf_counter()
+        for t in threads:
+            t.start()
+        self._work(sink, queues[-1], None, self.stats[-1])
+        for t in threads:
+            t.join()
+        self.elapsed = time.perf_counter() - tic
+
+        if self._error is not None:
+            raise self._error
+
+        return out
+
+    def _read(self, source: Iterable, q: queue.Queue):
+        s = self.stats[0]
+        try:
+            it = iter(source)
+            while True:
+                tic = time.perf_counter()
+                x = next(it, _END)
+                s.busy += time.perf_counter() - tic
+                if x is _END:
+                    break
+                s.items += 1
+                self._put(q, x)
+            self._put(q, _END)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _work(self, func: Callable, qin: queue.Queue, qout: queue.Queue | None, s: StageStats):
+        try:
+            while True:
+                n = qin.qsize()
+                x = self._get(qin)
+                if x is _END:
+                    break
+                s.items += 1
+                s.depth_sum += n
+                s.depth_max = max(s.depth_max, n)
+
+                tic = time.perf_counter()
+                y = func(x)
+                s.busy += time.perf_counter() - tic
+
+                if qout is not None and y is not None and np.size(y):
+                    self._put(qout, y)
+            if qout is not None:
+                self._put(qout, _END)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _fail(self, e: BaseException):
+        if self._error is None:
+            self._error = e
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, x):
+        while True:
+            try:
+                q.put(x, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    raise _Stopped
+
+    def _get(self, q: queue.Queue):
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise _Stopped
+
+    def report(self) -> str:
+        """table of per-stage blocks, busy time, utilization and input queue depth"""
+        lines = [
+            f"{'stage':8s} {'blocks':>7s} {'busy s':>8s} {'util %':>7s} {'queue':>6s} {'max':>4s}"
+        ]
+        for s in self.stats:
+            util = 100 * s.busy / self.elapsed if self.elapsed else 0.0
+            lines.append(
+                f"{s.name:8s} {s.items:7d} {s.busy:8.3f} {util:7.1f} {s.depth:6.2f} {s.depth_max:4d}"
+            )
+        lines.append(f"elapsed {self.elapsed:.3f} s, queue depth {self.depth}")
+
+        return "\n".join(lines)
+
+
+def _chain(stages: list) -> Callable:
+    def run(x):
+        for stage in stages:
+            x = stage(x)
+        return x
+
+    return run
+
+
+def demod_pipeline(
+    fs: int, fsaudio: int, fc: float | None, mode: str = "fm", depth: int = 4, **kwargs
+) -> Pipeline:
+    """
+    pipeline of the streaming demodulator "mode" ("am", "fm", "ssb"):
+    "ddc" (translation, channel filter, decimation) and "demod" (the remaining stages) threads
+
+    kwargs: options of radioutils.stream.am_stages / fm_stages / ssb_stages
+    """
+    stages = STAGES[mode](fs, fsaudio, fc, **kwargs)
+
+    # split after the first channel filter
+    i = next((i for i, s in enumerate(stages) if isinstance(s, (DDC, FirFilter))), -1) + 1
+    pipe = [("ddc", _chain(stages[:i]))]
+    if stages[i:]:
+        pipe.append(("demod", _chain(stages[i:])))
+
+    return Pipeline(pipe, depth)
+
+
+class WavSink:
+    """
+    incremental IEEE float32 WAV writer, complex blocks written as two channels I, Q.
+    The header sizes are filled in by close().
+    """
+
+    def __init__(self, fn: Path, fs: int):
+        self.fn = Path(fn).expanduser()
+        self.fs = int(fs)
+        self.f = self.fn.open("wb")
+        self.channels = 0
+        self.nbytes = 0
+
+    def __call__(self, x):
+        if np.iscomplexobj(x):
+            x = np.column_stack((x.real, x.imag))
+        x = np.asarray(x, np.float32)
+
+        if not self.channels:
+            self.channels = 1 if x.ndim == 1 else x.shape[1]
+            self._header()
+        x.tofile(self.f)
+        self.nbytes += x.nbytes
+
+    def _header(self):
+        align = 4 * self.channels
+        self.f.seek(0)
+        self.f.write(b"RIFF" + struct.pack("<I", 36 + self.nbytes) + b"WAVE")
+        self.f.write(
+            b"fmt "
+            + struct.pack("<IHHIIHH", 16, 3, self.channels, self.fs, self.fs * align, align, 32)
+        )
+        self.f.write(b"data" + struct.pack("<I", self.nbytes))
+
+    def close(self):
+        if self.channels:
+            self._header()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
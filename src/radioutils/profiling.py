@@ -0,0 +1,146 @@
+"""
+Per-stage profiling of the demodulators
+
+Pass a Profiler as profiler= to am_demod / fm_demod / ssb_demod to record, for each stage
+(loadbin, freq_translate or ddc, downsample, final_filter, discriminate, ...), its wall time,
+input samples (all channels), throughput and, with memory=True, the peak bytes allocated
+while it ran (tracemalloc, which NumPy reports its arrays to).
+Without a profiler each stage costs one extra "is None" check.
+
+Example:
+
+    with Profiler(memory=True) as prof:
+        fm_demod(Path("cap.bin"), 2.4e6, 48000, fc=-200e3, profiler=prof)
+    print(prof.report())
+    prof.write_jsonl(Path("profile.jsonl"))
+
+loadbin memory-maps captures, so their read time shows in the first stage touching the samples.
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class StageRecord(NamedTuple):
+    stage: str
+    seconds: float
+    samples: int  # input samples, all channels
+    peak_bytes: int | None  # None without memory tracing
+
+    @property
+    def rate(self) -> float:
+        """samples per second"""
+        return self.samples / self.seconds if self.seconds else 0.0
+
+
+class Profiler:
+    def __init__(self, memory: bool = False):
+        """
+        memory: record each stage's peak allocated bytes. Used as a context manager the profiler
+          starts tracemalloc (slowing allocations) unless already tracing, and stops it on exit.
+        """
+        self.memory = memory
+        self.records: list[StageRecord] = []
+        self._tracing = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        return self
+
+    def __exit__(self, *args):
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def totals(self) -> dict[str, StageRecord]:
+        """records summed by stage over all calls, in first-call order; peak_bytes is the maximum"""
+        out: dict[str, StageRecord] = {}
+        for r in self.records:
+            t = out.get(r.stage)
+            if t is None:
+                out[r.stage] = r
+                continue
+            peak = r.peak_bytes if t.peak_bytes is None else max(t.peak_bytes, r.peak_bytes or 0)
+            out[r.stage] = StageRecord(r.stage, t.seconds + r.seconds, t.samples + r.samples, peak)
+
+        return out
+
+    def report(self) -> str:
+        """table of time, share, throughput and peak memory of each stage"""
+        totals = self.totals()
+        total = sum(r.seconds for r in totals.values())
+
+        lines = [f"{'stage':16s} {'seconds':>8s} {'%':>5s} {'Msamp/s':>8s} {'peak MB':>8s}"]
+        for r in totals.values():
+            share = 100 * r.seconds / total if total else 0.0
+            peak = f"{r.peak_bytes / 1e6:8.1f}" if r.peak_bytes is not None else f"{'':8s}"
+            lines.append(f"{r.stage:16s} {r.seconds:8.4f} {share:5.1f} {r.rate / 1e6:8.2f} {peak}")
+        lines.append(f"{'total':16s} {total:8.4f}")
+
+        return "\n".join(lines)
+
+    def jsonl(self) -> str:
+        """one JSON object per record"""
+        return "".join(
+            json.dumps(r._asdict() | {"samples_per_s": r.rate}) + "\n" for r in self.records
+        )
+
+    def write_jsonl(self, fn: Path):
+        """append the records to JSON lines file fn"""
+        with Path(fn).expanduser().open("a") as f:
+            f.write(self.jsonl())
+
+
+class _Stage:
+    def __init__(self, profiler: Profiler, name: str, samples: int):
+        self.profiler = profiler
+        self.name = name
+        self.samples = samples
+
+    def __enter__(self):
+        self.trace = self.profiler.memory and tracemalloc.is_tracing()
+        if self.trace:
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.tic = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *args):
+        seconds = time.perf_counter() - self.tic
+        if exc_type is not None:
+            return
+        peak = tracemalloc.get_traced_memory()[1] - self.base if self.trace else None
+        self.profiler.records.append(StageRecord(self.name, seconds, self.samples, peak))
+
+
+class _Off:
+    """stage context of a disabled profiler"""
+
+    samples = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_OFF = _Off()
+
+
+def stage(profiler: Profiler | None, name: str, sig=None):
+    """
+    context recording stage "name" with input sig into profiler, doing nothing for None.
+    Set .samples of the context when the input size is only known afterwards.
+    """
+    if profiler is None:
+        return _OFF
+
+    return _Stage(profiler, name, 0 if sig is None else int(np.size(sig)))
@@ -0,0 +1,163 @@
+"""
+Readahead block reader for slow (network, spinning) storage
+
+A background thread reads the capture with readinto into a small pool of preallocated
+buffers, "readahead" blocks ahead of the consumer, so disk or network latency overlaps with
+the processing of earlier blocks instead of stalling it. The OS is told the access is
+sequential and asked to prefetch the blocks after the one being read (posix_fadvise),
+where supported. Memory is bounded by the pool: readahead * blocksize raw samples.
+Only the raw read buffers are reused: each block is converted into a newly allocated
+complex array, so the consumer may keep the blocks it is given.
+
+radioutils.stream.iterbin(..., readahead=n) and the streaming demodulators read through it.
+"""
+
+from pathlib import Path
+from typing import Iterator
+import mmap
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from . import _span, to_complex
+
+READAHEAD = 4  # blocks read ahead by default
+
+
+def advise(fd: int, offset: int, length: int, advice: str):
+    """
+    access pattern hint "sequential", "willneed" or "dontneed" for a byte range of open file fd,
+    ignored where posix_fadvise is not available
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, getattr(os, f"POSIX_FADV_{advice.upper()}"))
+    except OSError:  # e.g. not supported by the file system
+        pass
+
+
+def madvise(a: np.ndarray, advice: str):
+    """
+    access pattern hint "sequential", "willneed" or "dontneed" for the pages of np.memmap "a",
+    given to its own mapping; ignored for other arrays or where madvise is not available
+    """
+    m = getattr(a, "_mmap", None)
+    name = f"MADV_{advice.upper()}"
+    if m is None or not a.nbytes or not hasattr(mmap, name):
+        return
+
+    # byte offset of a in the mapping, rounded down to a page
+    start = a.ctypes.data - np.frombuffer(m, np.uint8).ctypes.data
+    page = start - start % mmap.PAGESIZE
+    try:
+        m.madvise(getattr(mmap, name), page, start + a.nbytes - page)
+    except (OSError, ValueError):  # e.g. not supported by the platform
+        pass
+
+
+class BlockReader:
+    def __init__(
+        self,
+        fn: Path,
+        fs: int | None,
+        blocksize: int,
+        tlim=None,
+        isamp=None,
+        dtype: str | None = None,
+        readahead: int = READAHEAD,
+    ):
+        """
+        iterable of consecutive complex blocks of "blocksize" samples of capture "fn"
+
+        tlim, isamp, dtype: as in radioutils.loadbin
+        readahead: number of blocks read ahead of the consumer
+
+        Each block is a freshly allocated complex64 (complex128 for cf64) array, not a view of
+        the read buffers, which are refilled; buffer reuse covers the raw I/O side only.
+        """
+        if readahead < 1:
+            raise ValueError("readahead must be at least one block")
+
+        self.fn, start, count, self.fmt = _span(fn, fs, tlim, isamp, dtype)
+        self.blocksize = blocksize
+        self.readahead = readahead
+
+        size = self.fn.stat().st_size
+        self.offset = min(start * self.fmt.itemsize, size)
+        end = size if count < 0 else min(size, self.offset + count * self.fmt.itemsize)
+        self.nbytes = (end - self.offset) // self.fmt.itemsize * self.fmt.itemsize
+
+        self.stall = 0.0  # [s] the consumer waited for data
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        free: queue.Queue = queue.Queue()
+        for _ in range(self.readahead):
+            free.put(np.empty(2 * self.blocksize, self.fmt.raw))
+        filled: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        t = threading.Thread(target=self._fill, args=(free, filled, stop), daemon=True)
+        t.start()
+        try:
+            while True:
+                tic = time.perf_counter()
+                item = filled.get()
+                self.stall += time.perf_counter() - tic
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                buf, n = item
+                x = to_complex(buf[:n], self.fmt)
+                # float formats are a view of the buffer, which is about to be refilled:
+                # copy, so every yielded block is a new array the consumer may keep
+                x = np.array(x) if self.fmt.raw.kind == "f" else x
+                free.put(buf)
+                yield x
+        finally:
+            stop.set()
+            free.put(None)
+            t.join()
+
+    def _fill(self, free: queue.Queue, filled: queue.Queue, stop: threading.Event):
+        try:
+            step = 2 * self.blocksize * self.fmt.raw.itemsize
+            with self.fn.open("rb", buffering=0) as f:
+                fd = f.fileno()
+                advise(fd, self.offset, self.nbytes, "sequential")
+                f.seek(self.offset)
+
+                pos = 0
+                while pos < self.nbytes:
+                    buf = free.get()
+                    if buf is None or stop.is_set():
+                        return
+
+                    n = min(step, self.nbytes - pos)
+                    start = self.offset + pos
+                    ahead = min(self.readahead * step, self.nbytes - pos - n)
+                    if ahead:  # length 0 would mean to the end of the file
+                        advise(fd, start + n, ahead, "willneed")
+
+                    view = memoryview(buf.view(np.uint8))[:n]
+                    got = 0
+                    while got < n:
+                        k = f.readinto(view[got:])
+                        if not k:  # file truncated while reading
+                            break
+                        got += k
+
+                    got -= got % self.fmt.itemsize
+                    if got:
+                        filled.put((buf, got // self.fmt.raw.itemsize))
+                    pos += got
+                    if got < n:
+                        break
+            filled.put(None)
+        except BaseException as e:
+            filled.put(e)
@@ -0,0 +1,173 @@
+"""
+Polyphase rational resampling
+
+The fs -> fsout ratio is the exact rational up/down of the two rates
+(e.g. 2.4 MHz -> 44.1 kHz is 147/8000, 2.048 MHz -> 44.1 kHz is 441/20480),
+so output plays at the correct rate.
+Only the kept output samples are computed: each one is the dot product of one polyphase
+branch of the anti-alias FIR with the most recent input samples.
+The outputs of each polyphase branch are one matrix-vector product of a strided window view
+of the input with the branch's taps, or, for filters with zero taps such as half-bands,
+are accumulated tap by tap from strided views skipping those taps. Either way nothing is
+gathered and, with out=, nothing is allocated per block.
+Signals are resampled along their last axis, e.g. all rows of a (n_channels, n_samples) array.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import scipy.signal as signal
+
+from .filtercache import cached
+from .workspace import Workspace
+
+MAXFACTOR = 2**17  # largest up or down factor: the anti-alias design has 20x as many taps
+
+
+def rational(fs: float, fsout: float, maxfactor: int = MAXFACTOR) -> tuple[int, int]:
+    """
+    up, down factors with fsout / fs == up / down exactly,
+    taking each rate as the decimal number it prints as, e.g. 2.048e6 or 44.1e3
+    """
+    r = Fraction(repr(float(fsout))) / Fraction(repr(float(fs)))
+    if max(r.numerator, r.denominator) > maxfactor:
+        raise ValueError(
+            f"resampling {fs} -> {fsout} Hz needs up/down {r.numerator}/{r.denominator},"
+            f" factors over {maxfactor}: round the rates"
+        )
+
+    return r.numerator, r.denominator
+
+
+@cached
+def resample_design(up: int, down: int):
+    """
+    unity-gain anti-alias FIR prototype, the same as scipy.signal.resample_poly designs
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+
+    return signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+
+
+class Resampler:
+    """
+    causal polyphase resampler by up/down, with input history and output phase carried
+    across blocks: resampling a signal in consecutive blocks gives the same output as at once.
+    """
+
+    MIN_RUN = 256  # outputs per polyphase branch to accumulate tap by tap, skipping zero taps
+
+    def __init__(self, up: int, down: int, h=None):
+        """
+        h: anti-alias FIR prototype at up * input rate, default resample_design(up, down).
+          up == down passes the input through, with no filter.
+        """
+        self.up = up
+        self.down = down
+
+        if up == down:
+            h = np.ones(1)
+        elif h is None:
+            h = resample_design(up, down)
+        else:
+            h = np.asarray(h)
+        self.K = -(-h.size // up)  # taps per polyphase branch
+        H = np.zeros(self.K * up)
+        H[: h.size] = h * up
+        H = H.reshape(self.K, up).T  # H[p, k] = h[p + k * up]
+        self.Hw = H[:, ::-1].copy()  # branch taps in input order, for window products
+        # skip taps that are zero in every branch, e.g. every other tap of a half-band filter
+        self.k = np.flatnonzero(H.any(axis=0))
+        self.H = H[:, self.k]
+
+        self.hist: np.ndarray | None = None  # last K-1 input samples
+        self.nin = 0  # input samples consumed
+        self.nout = 0  # output samples produced
+        self.ws = Workspace()
+
+    def reset(self):
+        """back to the initial state, as if no samples had been resampled"""
+        if self.hist is not None:
+            self.hist[:] = 0
+        self.nin = 0
+        self.nout = 0
+
+    def size(self, n: int) -> int:
+        """number of output samples the next n input samples produce"""
+        if self.up == self.down:
+            return n
+
+        return ((self.nin + n) * self.up - 1) // self.down + 1 - self.nout
+
+    def __call__(self, x, out=None):
+        """
+        resample x along its last axis
+
+        out: optional output array of at least self.size(x.shape[-1]) samples along its last axis.
+          The resampled samples are written to its start, and that view is returned.
+        """
+        N = x.shape[-1]
+        if self.up == self.down:
+            if out is None:
+                return x
+            out[..., :N] = x
+            return out[..., :N]
+
+        if self.hist is None:
+            self.hist = np.zeros(x.shape[:-1] + (self.K - 1,), x.dtype)
+            self.H = self.H.astype(np.finfo(x.dtype).dtype)
+            self.Hw = self.Hw.astype(x.dtype)
+
+        L = self.K - 1
+        buf = self.ws.buffer("input", x.shape[:-1] + (L + N,), self.hist.dtype)
+        buf[..., :L] = self.hist
+        buf[..., L:] = x
+
+        n = self.size(N)
+        dtype = np.result_type(buf, self.H)
+        y = np.empty(x.shape[:-1] + (n,), dtype) if out is None else out[..., :n]
+
+        if self.k.size < self.K and n >= self.MIN_RUN * self.up:
+            self._accumulate(buf, y)
+        elif n:
+            self._windows(buf, y)
+
+        self.nin += N
+        self.nout += n
+        self.hist[:] = buf[..., N:]
+
+        return y
+
+    def _first_input(self, m):
+        """polyphase branch of output(s) m, and index into the block buffer of the newest input"""
+        u = m * self.down
+        return u % self.up, u // self.up - self.nin + self.K - 1
+
+    def _accumulate(self, buf, y):
+        """outputs of each polyphase branch r::up, one multiply-add of a strided view per tap"""
+        n = y.shape[-1]
+        tmp = self.ws.buffer("tap", y.shape[:-1] + (-(-n // self.up),), y.dtype)
+        for r in range(min(self.up, n)):
+            yr = y[..., r :: self.up]
+            t = tmp[..., : yr.shape[-1]]
+            p, i0 = self._first_input(self.nout + r)
+            for j, k in enumerate(self.k):
+                x = buf[..., i0 - k : i0 - k + self.down * (yr.shape[-1] - 1) + 1 : self.down]
+                if j == 0:
+                    np.multiply(x, self.H[p, j], out=yr)
+                else:
+                    np.multiply(x, self.H[p, j], out=t)
+                    yr += t
+
+    def _windows(self, buf, y):
+        """outputs of each polyphase branch r::up, one product of strided input windows and taps"""
+        n = y.shape[-1]
+        L = self.K - 1
+        W = sliding_window_view(buf, self.K, axis=-1)  # W[..., i, :] = buf[..., i : i + K]
+        for r in range(min(self.up, n)):
+            yr = y[..., r :: self.up]
+            p, i0 = self._first_input(self.nout + r)
+            rows = W[..., i0 - L : i0 - L + self.down * (yr.shape[-1] - 1) + 1 : self.down, :]
+            np.matmul(rows, self.Hw[p], out=yr)
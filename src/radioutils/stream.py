@@ -0,0 +1,245 @@
+"""
+Block-by-block (streaming) demodulation
+
+Each stage carries its state across block boundaries (oscillator phase,
+FIR filter input history, resampler history and phase, FM discriminator previous sample),
+so concatenating the yielded audio blocks gives the same result as the single-shot
+am_demod/fm_demod/ssb_demod with causal=True, while memory stays at a few blocks
+regardless of the capture length.
+
+Example:
+
+    audio = np.concatenate(list(fm_demod_stream(Path("cap.bin"), fs, 48000, fc)))
+"""
+
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+import functools
+
+import numpy as np
+
+from . import FM_AUDIO_BW, _capture_fs, _openbin, as_precision, lpf_design, hpf_design
+from .formats import to_complex
+from .nco import NCO
+from .ddc import DDC, if_rate
+from .discriminator import Discriminator
+from .fir import FirFilter
+from .multistage import decimator_stages
+from .reader import READAHEAD, BlockReader
+
+BLOCKSIZE = 2**18  # samples per block read from disk
+
+
+def iterbin(
+    fn: Path,
+    fs: int,
+    blocksize: int = BLOCKSIZE,
+    tlim=None,
+    isamp=None,
+    dtype: str | None = None,
+    readahead: int = 0,
+) -> Iterator[np.ndarray]:
+    """
+    yield consecutive blocks of a capture, reading and converting only one block at a time.
+    tlim, isamp, dtype as in radioutils.loadbin
+    readahead: number of blocks read ahead in a background thread into reused raw buffers
+      (radioutils.reader.BlockReader), for slow storage. 0 memory-maps the capture.
+      The yielded blocks are new arrays either way.
+    """
+    if readahead:
+        yield from BlockReader(fn, fs, blocksize, tlim, isamp, dtype, readahead)
+        return
+
+    raw, fmt = _openbin(fn, fs, tlim, isamp, True, dtype)
+
+    for i in range(0, raw.size, 2 * blocksize):
+        x = to_complex(raw[i : i + 2 * blocksize], fmt)
+        yield np.array(x) if fmt.raw.kind == "f" else x
+
+
+def _blocks(src, fs: int, blocksize: int, dtype: str | None = None) -> Iterable[np.ndarray]:
+    if isinstance(src, (str, Path)):
+        return iterbin(Path(src), fs, blocksize, dtype=dtype, readahead=READAHEAD)
+    if isinstance(src, np.ndarray):
+        return (src[..., i : i + blocksize] for i in range(0, src.shape[-1], blocksize))
+
+    return src
+
+
+class Translator:
+    """
+    frequency translation by exp(j 2 pi fc t), with the oscillator phase continuing across blocks
+    """
+
+    def __init__(self, fc: float | None, fs: int):
+        self.nco = None if fc is None else NCO(fc, fs)
+
+    def __call__(self, x):
+        if self.nco is None:
+            return x
+
+        return self.nco.mix(x, np.empty(x.shape, x.dtype))
+
+
+def _caster(precision: str):
+    """stage casting blocks to the working precision, see radioutils.as_precision"""
+    return functools.partial(as_precision, precision=precision)
+
+
+def _run(stages, blocks) -> Iterator[np.ndarray]:
+    for x in blocks:
+        for stage in stages:
+            x = stage(x)
+        if x.size:
+            yield x
+
+
+def am_stages(
+    fs: int,
+    fsaudio: int,
+    fc: float | None,
+    fcutoff: float | None = 10e3,
+    frumble: float | None = None,
+    multistage: bool = False,
+    precision: str = "float64",
+) -> list:
+    """new stages of the streaming AM demodulator, with fresh state; fcutoff=None: no lowpass"""
+    stages: list = [_caster(precision), DDC(fc, fs, fsaudio, fcutoff if multistage else None)]
+
+    if fcutoff is not None:
+        assert fcutoff < 0.5 * fsaudio, "aliasing due to filter cutoff > 0.5*fs"
+        stages.append(FirFilter(lpf_design(fsaudio, fcutoff, precision=precision)))
+    stages.append(np.square)
+
+    if frumble is not None:
+        stages.append(FirFilter(hpf_design(fsaudio, frumble, precision=precision)))
+
+    return stages
+
+
+def fm_stages(
+    fs: int,
+    fsaudio: int,
+    fc: float | None,
+    fmdev=75e3,
+    multistage: bool = False,
+    ddc: bool = False,
+    discriminator: str = "conj",
+    precision: str = "float64",
+) -> list:
+    """new stages of the streaming FM demodulator, with fresh state"""
+    assert fmdev * 1.5 < 0.5 * fs, "aliasing due to filter cutoff > 0.5*fs"
+
+    fs_if = if_rate(fs, fsaudio, 4 * fmdev) if ddc else fs
+    stages: list = [_caster(precision)]
+    if fs_if < fs:
+        stages.append(DDC(fc, fs, fs_if, fmdev * 1.5))
+    else:
+        stages += [Translator(fc, fs), FirFilter(lpf_design(fs, fmdev * 1.5, precision=precision))]
+
+    Cfm = fs_if / (2 * np.sqrt(2) * np.pi * fmdev)
+    stages += [Discriminator(Cfm, discriminator), _caster(precision)]
+
+    fpass = min(FM_AUDIO_BW, 0.4 * fsaudio) if multistage else None
+    stages += decimator_stages(fs_if, fsaudio, fpass)
+
+    return stages
+
+
+def ssb_stages(
+    fs: int,
+    fsaudio: int,
+    fc: float | None,
+    fcutoff: float = 5e3,
+    multistage: bool = False,
+    precision: str = "float64",
+) -> list:
+    """new stages of the streaming SSB demodulator, with fresh state"""
+    return [_caster(precision), DDC(fc, fs, fsaudio, fcutoff if multistage else None)]
+
+
+STAGES: dict[str, Callable[..., list]] = {"am": am_stages, "fm": fm_stages, "ssb": ssb_stages}
+
+
+def am_demod_stream(
+    src,
+    fs: int,
+    fsaudio: int,
+    fc: float,
+    fcutoff: float | None = 10e3,
+    frumble: float | None = None,
+    blocksize: int = BLOCKSIZE,
+    multistage: bool = False,
+    precision: str = "float64",
+    dtype: str | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    streaming counterpart of radioutils.am_demod(..., causal=True, multistage=multistage,
+    precision=precision)
+
+    src: Path of capture (format as in radioutils.loadbin), array, or iterable of complex blocks.
+      Captures are read READAHEAD blocks ahead in a background thread;
+      fs=None takes a capture's sample rate from its SigMF sidecar.
+      Arrays and blocks may be (n_channels, n_samples), with fc one frequency per channel.
+    dtype: sample format of a capture file, as in radioutils.loadbin
+    yields blocks of demodulated audio at fsaudio
+    """
+    if isinstance(src, (str, Path)):
+        fs = _capture_fs(Path(src), fs)
+    stages = am_stages(fs, fsaudio, fc, fcutoff, frumble, multistage, precision)
+
+    yield from _run(stages, _blocks(src, fs, blocksize, dtype))
+
+
+def fm_demod_stream(
+    src,
+    fs: int,
+    fsaudio: int,
+    fc: float,
+    fmdev=75e3,
+    blocksize: int = BLOCKSIZE,
+    multistage: bool = False,
+    ddc: bool = False,
+    discriminator: str = "conj",
+    precision: str = "float64",
+    dtype: str | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    streaming counterpart of radioutils.fm_demod(..., causal=True) with the same
+    multistage, ddc, discriminator and precision options
+
+    src: Path of capture, array, or iterable of complex blocks, as in am_demod_stream
+    dtype: sample format of a capture file, as in radioutils.loadbin
+    yields blocks of demodulated monaural audio at fsaudio
+    """
+    if isinstance(src, (str, Path)):
+        fs = _capture_fs(Path(src), fs)
+    stages = fm_stages(fs, fsaudio, fc, fmdev, multistage, ddc, discriminator, precision)
+
+    yield from _run(stages, _blocks(src, fs, blocksize, dtype))
+
+
+def ssb_demod_stream(
+    src,
+    fs: int,
+    fsaudio: int,
+    fc: float,
+    fcutoff: float = 5e3,
+    blocksize: int = BLOCKSIZE,
+    multistage: bool = False,
+    precision: str = "float64",
+    dtype: str | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    streaming counterpart of radioutils.ssb_demod(..., causal=True, multistage=multistage,
+    precision=precision)
+
+    src: Path of capture, array, or iterable of complex blocks, as in am_demod_stream
+    dtype: sample format of a capture file, as in radioutils.loadbin
+    yields blocks of demodulated audio at fsaudio
+    """
+    if isinstance(src, (str, Path)):
+        fs = _capture_fs(Path(src), fs)
+    stages = ssb_stages(fs, fsaudio, fc, fcutoff, multistage, precision)
+
+    yield from _run(stages, _blocks(src, fs, blocksize, dtype))
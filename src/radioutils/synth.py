@@ -0,0 +1,139 @@
+"""
+Deterministic synthetic IQ captures, for tests and benchmarks
+
+am_signal, fm_signal and ssb_signal return n complex64 baseband samples of a tone "fmod"
+modulated on a carrier at "fc" Hz, plus seeded complex white Gaussian noise at "snr" dB,
+each computed in whole-array operations. As am_demod / fm_demod / ssb_demod translate by
++fc, demodulate them with fc=-fc.
+
+write_capture stores a signal in any radioutils.formats sample format, with a SigMF sidecar,
+so that loadbin / iterbin read it back:
+
+    sig = fm_signal(2**22, 2.4e6, fc=200e3)
+    fn = write_capture(tmpdir / "fm.cu8", sig, "cu8", fs=2.4e6)
+    audio = fm_demod(fn, None, 48000, fc=-200e3)
+"""
+
+from pathlib import Path
+import json
+
+import numpy as np
+
+from .formats import ALIASES, iq_format
+
+
+def _phase(n: int, fs: float, f: float) -> np.ndarray:
+    """carrier phase [rad] of n samples, wrapped in cycles so long signals stay exact"""
+    return 2 * np.pi * ((f / fs) * np.arange(n) % 1.0)
+
+
+def _tone(n: int, fs: float, fmod: float) -> np.ndarray:
+    return np.cos(_phase(n, fs, fmod))
+
+
+def _noisy(sig, snr: float | None, seed: int) -> np.ndarray:
+    if snr is not None:
+        rng = np.random.default_rng(seed)
+        power = np.mean(np.abs(sig) ** 2) * 10 ** (-snr / 10)
+        noise = rng.standard_normal((2, sig.size)) * np.sqrt(power / 2)
+        sig = sig + (noise[0] + 1j * noise[1])
+
+    return sig.astype(np.complex64)
+
+
+def am_signal(
+    n: int,
+    fs: float,
+    fc: float,
+    fmod: float = 1e3,
+    depth: float = 0.5,
+    amplitude: float = 0.7,
+    snr: float | None = 30.0,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    AM with carrier, peak envelope "amplitude"
+
+    depth: modulation index 0..1
+    snr: signal to noise ratio [dB], None for no noise
+    """
+    env = (amplitude / (1 + depth)) * (1 + depth * _tone(n, fs, fmod))
+
+    return _noisy(env * np.exp(1j * _phase(n, fs, fc)), snr, seed)
+
+
+def fm_signal(
+    n: int,
+    fs: float,
+    fc: float,
+    fmod: float = 1e3,
+    fmdev: float = 75e3,
+    amplitude: float = 0.7,
+    snr: float | None = 30.0,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    FM with peak deviation "fmdev" [Hz]
+    """
+    # integral of fmdev * cos(2 pi fmod t)
+    phase = _phase(n, fs, fc) + fmdev / fmod * np.sin(_phase(n, fs, fmod))
+
+    return _noisy(amplitude * np.exp(1j * phase), snr, seed)
+
+
+def ssb_signal(
+    n: int,
+    fs: float,
+    fc: float,
+    fmod: float = 1e3,
+    sideband: str = "usb",
+    amplitude: float = 0.7,
+    snr: float | None = 30.0,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    suppressed carrier single sideband: the tone at fc + fmod ("usb") or fc - fmod ("lsb")
+    """
+    if sideband not in ("usb", "lsb"):
+        raise ValueError(f"unknown sideband {sideband}")
+
+    f = fc + fmod if sideband == "usb" else fc - fmod
+
+    return _noisy(amplitude * np.exp(1j * _phase(n, fs, f)), snr, seed)
+
+
+def write_capture(
+    fn: Path, sig, dtype: str = "cf32", fs: float | None = None, fc: float | None = None
+) -> Path:
+    """
+    write complex sig as interleaved I/Q of sample format "dtype" (see radioutils.formats),
+    integer formats scaled from +/- 1.0 full scale and clipped.
+    With fs, also writes a SigMF .sigmf-meta sidecar of dtype, fs and center frequency fc.
+
+    returns fn
+    """
+    fn = Path(fn).expanduser()
+    fmt = iq_format(dtype)
+
+    v = np.asarray(sig, fmt.cdtype).view(np.finfo(fmt.cdtype).dtype)
+    if fmt.raw.kind == "f":
+        raw = v.astype(fmt.raw)
+    else:
+        info = np.iinfo(fmt.raw)
+        raw = np.clip(np.rint(v * fmt.scale + fmt.offset), info.min, info.max).astype(fmt.raw)
+    raw.tofile(fn)
+
+    if fs is not None:
+        capture: dict[str, float] = {"core:sample_start": 0}
+        if fc is not None:
+            capture["core:frequency"] = fc
+        meta = {
+            "global": {
+                "core:datatype": ALIASES.get(dtype.lower(), dtype.lower()),
+                "core:sample_rate": fs,
+            },
+            "captures": [capture],
+        }
+        fn.with_suffix(".sigmf-meta").write_text(json.dumps(meta, indent=2))
+
+    return fn
@@ -15,4 +15,4 @@ def test_fspl():
 
 
 def test_rainatt():
-    assert rain_attenuation(60e9, 10, 45, 40) == approx(4.96584345)
+    assert rain_attenuation(60e9, 10, 45, 40) == approx(4.89385841)
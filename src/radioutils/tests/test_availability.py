@@ -0,0 +1,91 @@
+import numpy as np
+from pytest import approx
+
+from radioutils.availability import Availability, availability, read_rain
+from radioutils.impairments import rain_attenuation
+
+
+def links(n=20):
+    rng = np.random.default_rng(1)
+    return {
+        "range_m": rng.uniform(1e3, 20e3, n),
+        "freq_hz": rng.uniform(10e9, 40e9, n),
+        "tx_dbm": np.full(n, 20.0),
+        "rx_dbm": np.full(n, -70.0),
+        "tx_gain_dbi": 38.0,
+        "rx_gain_dbi": 38.0,
+    }
+
+
+def rain(n=20000):
+    """showers: bursts of rain on mostly dry minutes"""
+    rng = np.random.default_rng(2)
+    r = rng.exponential(20.0, n) * (rng.uniform(size=n) < 0.05)
+    return np.convolve(r, np.ones(30), "same")
+
+
+def fade_durations(out):
+    """reference: lengths of the runs of True in each column"""
+    durations = []
+    for p in range(out.shape[1]):
+        x = np.r_[False, out[:, p], False].astype(int)
+        d = np.diff(x)
+        durations.append(np.flatnonzero(d == -1) - np.flatnonzero(d == 1))
+    return durations
+
+
+def test_attenuation():
+    t = links()
+    acc = Availability(t, "h", 10.0)
+    r = np.array([0.0, 1.0, 50.0])
+    att = acc.attenuation(r)
+    ref = rain_attenuation(t["freq_hz"], r[:, None], "h", 10.0) * t["range_m"] / 1e3
+
+    assert att.shape == (3, t["range_m"].size)
+    assert att == approx(ref, rel=1e-9)
+
+
+def test_chunked():
+    t = links()
+    r = rain()
+
+    whole = Availability(t, "v")
+    margin = whole.update(r)
+    chunked = availability((r[i : i + 777] for i in range(0, r.size, 777)), t, "v")
+
+    out = margin < 0
+    assert out.any() and not out.all()
+    assert (whole.outage == out.sum(axis=0)).all()
+    assert (chunked.outage == whole.outage).all()
+    assert chunked.availability == approx(100 * (1 - out.mean(axis=0)))
+    assert chunked.worst == approx(margin.min(axis=0))
+
+    ref = np.array([np.histogram(d, whole.bins)[0] for d in fade_durations(out)])
+    assert (whole.fades == ref).all()
+    assert (chunked.fades == ref).all()
+    assert (chunked.columns()["fades"] == ref.sum(axis=1)).all()
+
+
+def test_read_rain(tmp_path):
+    r = rain(1000)
+
+    np.save(tmp_path / "r.npy", r)
+    np.savetxt(tmp_path / "r.csv", r, header="rain_mmh", comments="")
+    r.astype(np.float32).tofile(tmp_path / "r.f32")
+
+    for name in ("r.npy", "r.csv", "r.f32"):
+        blocks = list(read_rain(tmp_path / name, chunk=300))
+        assert [b.size for b in blocks] == [300, 300, 300, 100]
+        assert np.concatenate(blocks) == approx(r, rel=1e-6)
+
+    two = np.column_stack([r, 2 * r]).astype(np.float32)
+    two.tofile(tmp_path / "r2.f32")
+    (block,) = read_rain(tmp_path / "r2.f32", chunk=1000, columns=2)
+    assert block == approx(two)
+
+    t = links(2)
+    acc = availability(tmp_path / "r2.f32", t, "v", chunk=128, columns=2)
+    ref = Availability(t, "v")
+    ref.update(two)
+    assert (acc.outage == ref.outage).all()
+    assert (acc.fades == ref.fades).all()
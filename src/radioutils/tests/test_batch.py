@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+import scipy.io.wavfile
+
+from radioutils import fm_demod, loadbin
+from radioutils.batch import make_jobs, run, summary
+from radioutils.synth import fm_signal, write_capture
+
+fs = 240e3
+
+
+def test_batch(tmp_path):
+    t = np.arange(48000) / fs
+    for name, f in (("a", -20e3), ("b", 10e3)):
+        np.exp(2j * np.pi * f * t).astype(np.complex64).tofile(tmp_path / f"{name}.bin")
+    (tmp_path / "bad.bin").write_bytes(b"")
+
+    manifest = tmp_path / "list.csv"
+    manifest.write_text("fn,fs,fc,mode\na.bin,,20e3,\nb.bin,240e3,-10e3,am\nbad.bin,,,\n")
+
+    jobs = make_jobs([manifest], tmp_path / "out", fs=fs, mode="fm")
+    assert [j.mode for j in jobs] == ["fm", "am", "fm"]
+    assert jobs[0].fc == 20e3 and jobs[1].fs == fs
+
+    results = run(jobs, 48000)
+    assert [r.status for r in results] == ["ok", "ok", "failed"]
+    assert results[0].samples == t.size
+    fsaudio, audio = scipy.io.wavfile.read(jobs[1].out)
+    # AM output is complex: I, Q channels
+    assert fsaudio == 48000 and audio.dtype == np.float32 and audio.shape == (9600, 2)
+
+    # resume: finished outputs are skipped
+    results = run(make_jobs([str(tmp_path / "*.bin")], tmp_path / "out", fs, 20e3), 48000)
+    assert [r.status for r in results] == ["skipped", "skipped", "failed"]
+    assert "2 skipped, 1 failed" in summary(results)
+
+
+def test_batch_same_names(tmp_path):
+    sig = np.exp(2j * np.pi * 10e3 * np.arange(24000) / fs).astype(np.complex64)
+    for night in ("night1", "night2"):
+        (tmp_path / night).mkdir()
+        sig.tofile(tmp_path / night / "cap.bin")
+    sig.tofile(tmp_path / "night1" / "cap.cf32")
+
+    jobs = make_jobs([str(tmp_path / "*" / "cap.*")], tmp_path / "out", fs, -10e3)
+    assert [j.out.relative_to(tmp_path / "out").as_posix() for j in jobs] == [
+        "night1/cap.bin.wav",
+        "night1/cap.cf32.wav",
+        "night2/cap.bin.wav",
+    ]
+    results = run(jobs, 48000)
+    assert [r.status for r in results] == ["ok", "ok", "ok"]
+
+    manifest = tmp_path / "list.csv"
+    manifest.write_text("fn\nnight1/cap.bin\nnight2/cap.bin\n")
+    assert [j.out for j in make_jobs([manifest], tmp_path / "out", fs)] == [
+        jobs[0].out,
+        jobs[2].out,
+    ]
+
+    with pytest.raises(ValueError):
+        make_jobs([manifest, str(tmp_path / "night*" / "*.bin")], tmp_path / "out", fs)
+
+
+@pytest.mark.parametrize("mode", ["am", "fm", "ssb"])
+def test_batch_audio_rate(tmp_path, mode):
+    # captures already at the audio rate
+    sig = np.exp(2j * np.pi * 1e3 * np.arange(24000) / 48000).astype(np.complex64)
+    sig.tofile(tmp_path / "cap.bin")
+
+    jobs = make_jobs([str(tmp_path / "*.bin")], tmp_path / "out", 48000, -1e3, mode)
+    kwargs = {"fmdev": 5e3} if mode == "fm" else {}
+    assert [r.status for r in run(jobs, 48000, **kwargs)] == ["ok"]
+
+
+def test_batch_dtype(tmp_path):
+    # cu8 captures without a SigMF sidecar
+    sig = fm_signal(24000, fs, 20e3, fmdev=5e3)
+    write_capture(tmp_path / "a.cu8", sig, "cu8")
+    write_capture(tmp_path / "b.bin", sig, "cu8")
+    ref = fm_demod(
+        loadbin(tmp_path / "a.cu8", fs, dtype="cu8"), fs, 48000, -20e3, 5e3, causal=True
+    )
+
+    # by suffix, by default dtype, and from the manifest
+    jobs = make_jobs([str(tmp_path / "a.cu8")], tmp_path / "out", fs, -20e3, fmt="npy")
+    jobs += make_jobs(
+        [str(tmp_path / "b.bin")], tmp_path / "out", fs, -20e3, fmt="npy", dtype="cu8"
+    )
+    manifest = tmp_path / "list.csv"
+    manifest.write_text("fn,dtype\nb.bin,cu8\n")
+    jobs += make_jobs([manifest], tmp_path / "out2", fs, -20e3, fmt="npy")
+    assert [j.dtype for j in jobs] == [None, "cu8", "cu8"]
+
+    results = run(jobs, 48000, fmdev=5e3)
+    assert [r.status for r in results] == ["ok"] * 3
+    assert [r.samples for r in results] == [sig.size] * 3
+    for job in jobs:
+        assert np.allclose(np.load(job.out), ref)
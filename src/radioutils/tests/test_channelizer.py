@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from radioutils.channelizer import Channelizer, channelize, demod_channels, pfb_design
+
+fs = 2.4e6
+
+
+def fm_station(f, ftone, n):
+    t = np.arange(n) / fs
+    m = np.sin(2 * np.pi * ftone * t)
+    return np.exp(2j * np.pi * (f * t + 75e3 * np.cumsum(m) / fs))
+
+
+def test_channelizer_reference():
+    M, P = 8, 4
+    x = np.random.default_rng(4).standard_normal(400) + 1j
+    y = Channelizer(M, P)(x)
+
+    # channel k: translate by -k fs/M, filter with prototype, keep every M/2
+    h = pfb_design(M, P)
+    for k in (0, 1, 5):
+        ref = np.convolve(x * np.exp(-2j * np.pi * k * np.arange(x.size) / M), h)[: x.size]
+        assert np.allclose(y[:, k], ref[:: M // 2])
+
+
+def test_channelizer_blocks():
+    x = np.random.default_rng(5).standard_normal(5000).astype(np.complex64)
+    ref = Channelizer(12)(x)
+
+    ch = Channelizer(12)
+    y = np.concatenate([ch(x[i : i + 701]) for i in range(0, x.size, 701)])
+    assert y.dtype == np.complex64
+    assert np.allclose(y, ref, atol=1e-5)
+
+
+def test_channelize_offsets():
+    chans, fs_chan, offsets = channelize(np.zeros(1200, complex), fs, [-400e3, 230e3], 200e3)
+    assert chans.shape == (2, 200)
+    assert fs_chan == 400e3
+    assert offsets == pytest.approx([0, 30e3])
+
+    with pytest.raises(ValueError):
+        channelize(np.zeros(1200, complex), fs, [0], 250e3)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_demod_channels(workers):
+    n = 240000
+    stations = {-400e3: 1e3, 200e3: 2e3, 830e3: 3e3}
+    sig = sum(fm_station(f, ftone, n) for f, ftone in stations.items())
+
+    audio = demod_channels(sig, fs, list(stations), 48000, workers=workers)
+
+    for m, ftone in zip(audio, stations.values()):
+        f = np.fft.rfftfreq(m.size, 1 / 48000)
+        assert f[np.abs(np.fft.rfft(m)).argmax()] == pytest.approx(ftone, abs=20)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from radioutils.coverage import coverage_map
+from radioutils.distrssi import dist2rssi
+
+
+def transmitters(n=7):
+    rng = np.random.default_rng(3)
+    return rng.uniform(-50, 550, n), rng.uniform(-50, 350, n), rng.uniform(-20, 10, n)
+
+
+def reference(x, y, tx_x, tx_y, tx_dbm, freq_hz, height):
+    d = np.sqrt(
+        (x[None, None, :] - tx_x[:, None, None]) ** 2
+        + (y[None, :, None] - tx_y[:, None, None]) ** 2
+        + np.asarray(height)[..., None, None] ** 2
+    )
+    rssi = np.stack([dist2rssi(d[i], tx_dbm[i], freq_hz) for i in range(d.shape[0])])
+    return rssi.max(axis=0), rssi.argmax(axis=0)
+
+
+def test_coverage_map():
+    x = np.linspace(0.5, 499.5, 123)
+    y = np.linspace(0.5, 299.5, 77)
+    tx_x, tx_y, tx_dbm = transmitters()
+
+    rssi, server = coverage_map(x, y, tx_x, tx_y, tx_dbm, 915e6, height=10.0, tile=32)
+    ref, best = reference(x, y, tx_x, tx_y, tx_dbm, 915e6, 10.0)
+
+    assert rssi.shape == server.shape == (77, 123)
+    assert rssi.dtype == np.float32 and server.dtype == np.int32
+    assert rssi == approx(ref, abs=1e-4)
+    assert (server == best).all()
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_coverage_files(tmp_path, workers):
+    x = np.arange(0.0, 500.0, 7.0)
+    y = np.arange(0.0, 300.0, 7.0)
+    tx_x, tx_y, tx_dbm = transmitters()
+    mem = coverage_map(x, y, tx_x, tx_y, tx_dbm, tile=16)
+
+    rssi, server = coverage_map(
+        x,
+        y,
+        tx_x,
+        tx_y,
+        tx_dbm,
+        tile=16,
+        workers=workers,
+        rssi_fn=tmp_path / "rssi.npy",
+        server_fn=tmp_path / "server.npy",
+    )
+    assert isinstance(rssi, np.memmap)
+    assert (rssi == mem[0]).all() and (server == mem[1]).all()
+    assert (np.load(tmp_path / "rssi.npy") == mem[0]).all()
+    assert (np.load(tmp_path / "server.npy") == mem[1]).all()
+
+    if workers:
+        rssi, server = coverage_map(x, y, tx_x, tx_y, tx_dbm, tile=16, workers=workers)
+        assert (rssi == mem[0]).all() and (server == mem[1]).all()
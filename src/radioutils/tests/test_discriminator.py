@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from radioutils.discriminator import Discriminator, atan2_poly, discriminate
+
+
+def fm(n=50000):
+    rng = np.random.default_rng(6)
+    phase = np.cumsum(rng.uniform(-3, 3, n))
+    return (np.exp(1j * phase) * rng.uniform(0.1, 2, n)).astype(np.complex64)
+
+
+@pytest.mark.parametrize("method,tol", [("conj", 1e-5), ("fast", 5e-5)])
+def test_methods(method, tol):
+    x = fm()
+    ref = discriminate(x.astype(np.complex128), 2.0, method="unwrap")
+
+    y = discriminate(x, 2.0, method=method)
+    assert y.dtype == np.float32
+    assert np.abs(y - ref).max() < tol
+
+
+def test_atan2_poly():
+    y, x = np.random.default_rng(7).standard_normal((2, 10000)).astype(np.float32)
+    out = atan2_poly(y, x, np.empty_like(x))
+    assert np.abs(out - np.arctan2(y, x)).max() < 2e-5
+
+
+@pytest.mark.parametrize("method", ["conj", "fast", "unwrap"])
+def test_blocks(method):
+    x = fm()
+    ref = discriminate(x, 3.0, method=method)
+
+    d = Discriminator(3.0, method)
+    y = np.concatenate([d(x[i : i + 3000]) for i in range(0, x.size, 3000)])
+    assert y.shape == ref.shape
+    assert np.allclose(y, ref, atol=1e-5)
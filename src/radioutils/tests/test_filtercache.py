@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import radioutils as ru
+from radioutils.filtercache import FilterCache
+
+
+def test_designs_cached():
+    b = ru.lpf_design(48000, 5e3)
+    assert ru.lpf_design(48000.0, 5000) is b
+    assert ru.lpf_design(48000, 5e3, L=50) is b
+    assert ru.lpf_design(48000, 5e3, 51) is not b
+    assert not b.flags.writeable
+
+    with pytest.raises(ValueError):
+        b[0] = 0
+
+
+def test_lru_persistent(tmp_path):
+    calls = []
+
+    def design(x):
+        calls.append(x)
+        return np.full(3, x)
+
+    cache = FilterCache(maxsize=2, path=tmp_path)
+    for x in (1, 2, 1, 3, 2):
+        assert (cache.get(("f", x), lambda: design(x)) == x).all()
+    assert calls == [1, 2, 3]  # 2 was evicted from memory, but found on disk
+    assert len(list(tmp_path.glob("f-*.npy"))) == 3
+
+    cache = FilterCache(path=tmp_path)
+    assert (cache.get(("f", 3), lambda: design(3)) == 3).all()
+    assert calls == [1, 2, 3]
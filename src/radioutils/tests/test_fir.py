@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+import scipy.signal as signal
+
+import radioutils as ru
+from radioutils.fir import FirFilter, ols_nfft
+
+
+def test_nfft():
+    for ntaps in (1, 8, 50, 199, 256):
+        nfft = ols_nfft(ntaps)
+        assert nfft & (nfft - 1) == 0
+        assert nfft >= 2 * (ntaps - 1)
+
+
+@pytest.mark.parametrize("method", ["direct", "fft", "auto"])
+@pytest.mark.parametrize("dtype", [np.float64, np.complex128])
+def test_lfilter(method, dtype):
+    rng = np.random.default_rng(5)
+    x = rng.standard_normal(30000).astype(dtype)
+    b = ru.bpf_design(48000, 5e3)
+    ref = signal.lfilter(b, 1, x)
+
+    assert np.allclose(FirFilter(b, method)(x), ref, atol=1e-12)
+
+    f = FirFilter(b, method)
+    y = np.concatenate([f(x[i : i + 7001]) for i in range(0, x.size, 7001)])
+    assert np.allclose(y, ref, atol=1e-12)
+
+
+def test_float32():
+    x = np.random.default_rng(6).standard_normal(20000).astype(np.complex64)
+    b = ru.hpf_design(48000, 300, precision="float32")
+
+    y = FirFilter(b, "fft")(x)
+    assert y.dtype == np.complex64
+    assert np.allclose(y, signal.lfilter(b.astype(float), 1, x), atol=1e-5)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from radioutils.impairments import rain_attenuation
+
+
+@pytest.mark.parametrize("polarization", ["h", "v", 45.0])
+def test_rain_tables(polarization):
+    f = np.logspace(9, 13, 10001)
+    fast = rain_attenuation(f, 10, polarization, 40)
+    assert fast == approx(rain_attenuation(f, 10, polarization, 40, exact=True), rel=1e-7)
+
+
+def test_rain_broadcast():
+    f = np.array([10e9, 30e9, 60e9])
+    rate = np.array([1.0, 10.0, 100.0])[:, None]
+    elevation = np.array([10.0, 40.0])[:, None, None]
+
+    att = rain_attenuation(f, rate, 45.0, elevation)
+    assert att.shape == (2, 3, 3)
+    assert att[1, 1, 2] == approx(rain_attenuation(60e9, 10, 45, 40))
+
+    assert rain_attenuation(f, 10, "v", elevation).shape == (2, 1, 3)
+    assert rain_attenuation(f, 10, np.full((4, 1), 45.0), 40).shape == (4, 3)
+    assert np.isscalar(rain_attenuation(60e9, 10, "h", 40))
+
+    with pytest.raises(ValueError):
+        rain_attenuation(f, 10, np.array([45.0, 100.0]), 40)
+    with pytest.raises(ValueError):
+        rain_attenuation(f, 10, "x", 40)
+
+
+def test_rain_tilt():
+    f = np.array([10e9, 30e9, 60e9])
+    # the elliptical model at 0 / 90 degrees tilt on a horizontal path is "h" / "v"
+    assert rain_attenuation(f, 10, 0.0, 0) == approx(rain_attenuation(f, 10, "h", 0))
+    assert rain_attenuation(f, 10, 90.0, 0) == approx(rain_attenuation(f, 10, "v", 0))
+
+    att = rain_attenuation(30e9, 10, np.array([0.0, 45.0, 90.0]), 40)
+    assert att[0] > att[1] > att[2]
+    assert att[0] < rain_attenuation(30e9, 10, "h", 40)
+    assert att[2] > rain_attenuation(30e9, 10, "v", 40)
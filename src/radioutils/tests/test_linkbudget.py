@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from pytest import approx
+
+from radioutils import Link
+from radioutils.impairments import rain_attenuation
+from radioutils.linkbudget import budget, columns, link_budget, read_links, write_links
+
+
+def links(n=1000):
+    rng = np.random.default_rng(0)
+    return {
+        "id": np.arange(n, dtype=float),
+        "range_m": rng.uniform(10, 50e3, n),
+        "freq_hz": rng.uniform(1e9, 40e9, n),
+        "tx_dbm": rng.uniform(0, 30, n),
+        "rx_dbm": np.full(n, -90.0),
+        "rx_gain_dbi": 6.0,
+    }
+
+
+def test_link_budget():
+    t = links()
+    res = link_budget(t["range_m"], t["freq_hz"], t["tx_dbm"], -90, loss_db=1.0, chunk=300)
+    assert res.dtype.itemsize == 12
+
+    for i in (0, 299, 300, 999):
+        link = Link(t["range_m"][i], t["freq_hz"][i], t["tx_dbm"][i], -90)
+        assert res["fspl_db"][i] == approx(link.fspl()[0], rel=1e-6)
+        assert res["margin_db"][i] == approx(link.linkbudget()[0] - 1.0, abs=1e-4)
+
+    assert link_budget(10, 2450e6, 20, -80)["fspl_db"] == approx(60.23110491)
+
+    with pytest.raises(ValueError):
+        link_budget(t["range_m"], t["freq_hz"][:10], 20, -80)
+
+
+def test_budget_table():
+    t = links()
+    rain = rain_attenuation(t["freq_hz"], 25, "v", 30) * t["range_m"] / 1e3
+    res = budget(t | {"loss_db": rain})
+
+    assert res["prx_dbm"] == approx(
+        t["tx_dbm"] + 6 - rain - link_budget(t["range_m"], t["freq_hz"], 0, 0)["fspl_db"], abs=1e-3
+    )
+    assert res["margin_db"] == approx(res["prx_dbm"] + 90, abs=1e-4)
+
+    with pytest.raises(ValueError):
+        budget({"range_m": t["range_m"]})
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".npz"])
+def test_link_io(tmp_path, suffix):
+    t = links()
+    t["rx_gain_dbi"] = np.full(t["id"].size, 6.0)
+    fn = tmp_path / f"links{suffix}"
+
+    write_links(fn, t)
+    table = read_links(fn)
+    assert list(table) == list(t)
+    for k in t:
+        assert table[k] == approx(t[k], rel=1e-9)
+
+    res = budget(table)
+    write_links(fn, table | columns(res))
+    merged = read_links(fn)
+    assert merged["margin_db"] == approx(res["margin_db"], abs=1e-5)
+    # the merged table keeps the RX sensitivity and budgets to the same margins
+    assert merged["rx_dbm"] == approx(t["rx_dbm"])
+    assert budget(merged)["margin_db"] == approx(res["margin_db"], abs=1e-5)
@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+import pytest
+from pytest import approx
+
+import radioutils as ru
+from radioutils.formats import sigmf_meta
+from radioutils.stream import fm_demod_stream, iterbin
+from radioutils import synth
+
+
+def write_capture(path, n=20000, fs=100e3, fc=10e3):
+    t = np.arange(n) / fs
+    sig = np.exp(-2j * np.pi * fc * t).astype(np.complex64)
+    sig.tofile(path)
+    return sig
+
+
+def test_loadbin_mmap(tmp_path):
+    fn = tmp_path / "cap.bin"
+    ref = write_capture(fn)
+
+    sig = ru.loadbin(fn, 100e3, mmap=True)
+    assert isinstance(sig, np.memmap)
+    assert not sig.flags.writeable
+    assert np.array_equal(sig, ref)
+
+    sig = ru.loadbin(fn, 100e3, isamp=(100, 300), mmap=True)
+    assert np.array_equal(sig, ref[100:300])
+    assert np.array_equal(sig, ru.loadbin(fn, 100e3, isamp=(100, 300)))
+
+    sig = ru.loadbin(fn, 100e3, tlim=(0.01, 0.02), mmap=True)
+    assert np.array_equal(sig, ref[1000:2000])
+
+
+def test_demod_mmap(tmp_path):
+    fn = tmp_path / "cap.bin"
+    ref = write_capture(fn)
+
+    sig = ru.loadbin(fn, 100e3, mmap=True)
+    m = ru.am_demod(sig, 100e3, 10e3, 10e3, fcutoff=2e3)
+    assert np.array_equal(np.fromfile(fn, np.complex64), ref), "capture must not be modified"
+
+    assert np.allclose(m, ru.am_demod(ref.copy(), 100e3, 10e3, 10e3, fcutoff=2e3))
+    assert m[-100:].mean() == approx(1.0, rel=0.05)
+
+
+@pytest.mark.parametrize(
+    "dtype,raw,scale,offset",
+    [("cu8", np.uint8, 127.5, 127.5), ("cs8", np.int8, 128, 0), ("cs16", np.int16, 32768, 0)],
+)
+def test_loadbin_integer(tmp_path, dtype, raw, scale, offset):
+    iq = np.random.default_rng(1).integers(np.iinfo(raw).min, np.iinfo(raw).max, 2000, dtype=raw)
+    fn = tmp_path / f"cap.{dtype}"
+    iq.tofile(fn)
+
+    ref = (iq[::2] - offset) / scale + 1j * (iq[1::2] - offset) / scale
+
+    sig = ru.loadbin(fn, 1e6, dtype=dtype)
+    assert sig.dtype == np.complex64
+    assert np.allclose(sig, ref, atol=1e-6)
+
+    sig = ru.loadbin(fn, 1e6, isamp=(10, 20), mmap=True, dtype=dtype)
+    assert np.allclose(sig, ref[10:20], atol=1e-6)
+
+    blocks = list(iterbin(fn, 1e6, blocksize=300, dtype=dtype))
+    assert len(blocks) == 4
+    assert np.allclose(np.concatenate(blocks), ref, atol=1e-6)
+
+
+def test_sigmf(tmp_path):
+    iq = np.arange(-100, 100, dtype=np.int16)
+    fn = tmp_path / "cap.sigmf-data"
+    iq.tofile(fn)
+    meta = {
+        "global": {"core:datatype": "ci16_le", "core:sample_rate": 2.4e6},
+        "captures": [{"core:sample_start": 0, "core:frequency": 98.5e6}],
+    }
+    fn.with_suffix(".sigmf-meta").write_text(json.dumps(meta))
+
+    assert sigmf_meta(fn) == {"dtype": "ci16_le", "fs": 2.4e6, "center_freq": 98.5e6}
+
+    sig = ru.loadbin(fn, None, tlim=(0, 40 / 2.4e6))
+    assert sig.size == 40
+    assert sig[0] == approx((-100 - 99j) / 32768)
+
+
+def test_suffix_format(tmp_path):
+    fs = 240e3
+    sig = synth.fm_signal(48000, fs, 20e3, fmdev=5e3)
+    fn = synth.write_capture(tmp_path / "cap.cu8", sig, "cu8")
+    ref = ru.loadbin(fn, fs, dtype="cu8")
+
+    # no sidecar: the format is taken from the suffix
+    assert np.array_equal(ru.loadbin(fn, fs), ref)
+    audio = ru.fm_demod(ref, fs, 48e3, -20e3, fmdev=5e3, causal=True)
+    assert np.allclose(ru.fm_demod(fn, fs, 48e3, -20e3, fmdev=5e3, causal=True), audio)
+
+    # unknown suffix: dtype= is passed through the file paths of the demodulators
+    fn = fn.rename(tmp_path / "cap.bin")
+    assert not np.array_equal(ru.loadbin(fn, fs), ref)
+    out = ru.fm_demod(fn, fs, 48e3, -20e3, fmdev=5e3, causal=True, dtype="cu8")
+    assert np.allclose(out, audio)
+    out = ru.fm_demod(fn, fs, 48e3, -20e3, fmdev=5e3, workers=2, dtype="cu8")
+    assert np.allclose(out, audio, atol=1e-6)
+    blocks = fm_demod_stream(fn, fs, 48e3, -20e3, fmdev=5e3, blocksize=5000, dtype="cu8")
+    assert np.allclose(np.concatenate(list(blocks)), audio, atol=1e-6)
@@ -0,0 +1,56 @@
+import numpy as np
+from pytest import approx
+
+from radioutils.distrssi import multilaterate, rssi2dist
+
+
+def reports(tags=50, beacons=5, dims=2, seed=0):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(0, 30, (tags, dims))
+    b = rng.uniform(0, 30, (tags, beacons, dims))
+    ctx = rng.uniform(-65, -55, (tags, beacons))
+    rexp = rng.uniform(1.8, 3.0, (tags, beacons))
+    d = np.linalg.norm(b - pos[:, None], axis=2)
+    rssi = ctx - 10 * rexp * np.log10(d)
+    # tag IDs not in report order
+    tag = np.repeat(rng.permutation(tags) * 10, beacons)
+
+    return tag, b.reshape(-1, dims), rssi.ravel(), ctx.ravel(), rexp.ravel(), pos
+
+
+def test_exact():
+    for dims in (2, 3):
+        tag, b, rssi, ctx, rexp, pos = reports(dims=dims)
+        tags, xy = multilaterate(tag, b, rssi, ctx, rexp)
+
+        assert (tags == np.unique(tag)).all()
+        ref = pos[np.argsort(tag[::5])]
+        assert xy == approx(ref, abs=1e-6)
+
+
+def test_refine():
+    tag, b, rssi, ctx, rexp, pos = reports(200, 8, seed=1)
+    noisy = rssi + np.random.default_rng(2).normal(0, 1.0, rssi.size)
+    ref = pos[np.argsort(tag[::8])]
+
+    _, linear = multilaterate(tag, b, noisy, ctx, rexp, iterations=0)
+    _, refined = multilaterate(tag, b, noisy, ctx, rexp)
+
+    def residual(xy):
+        g = np.searchsorted(np.unique(tag), tag)
+        return np.sum((np.linalg.norm(xy[g] - b, axis=1) - rssi2dist(ctx, noisy, rexp)) ** 2)
+
+    assert residual(refined) < residual(linear)
+    assert residual(refined) < residual(ref)
+    assert np.median(np.linalg.norm(refined - ref, axis=1)) < 3.0
+
+    # one tag alone gives the same fix as in the batch
+    i = tag == tag[0]
+    _, one = multilaterate(tag[i], b[i], noisy[i], ctx[i], rexp[i])
+    assert one[0] == approx(refined[np.searchsorted(np.unique(tag), tag[0])])
+
+
+def test_one_beacon():
+    tags, xy = multilaterate([7], [[1.0, 2.0]], [-70.0], -59)
+    assert tags == [7]
+    assert xy == approx(np.array([[1.0, 2.0]]))
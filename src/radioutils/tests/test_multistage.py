@@ -0,0 +1,67 @@
+import numpy as np
+from pytest import approx
+
+import radioutils as ru
+from radioutils.multistage import CIC, plan_decimation
+from radioutils.stream import ssb_demod_stream
+
+
+def tone(f, fs, n):
+    return np.exp(2j * np.pi * f * np.arange(n) / fs).astype(np.complex64)
+
+
+def test_plan():
+    plan = plan_decimation(10e6, 48e3, 10e3)
+
+    assert plan.specs[0].kind == "cic"
+    assert plan.specs[-1].kind == "fir"
+    assert plan.macs < plan.single_stage_macs / 1.4
+    assert "MMAC/s" in str(plan)
+
+    plan = plan_decimation(10e6, 48e3, 15e3, fstop=24e3)
+    assert plan.macs < plan.single_stage_macs / 2
+
+
+def test_plan_response():
+    fs = 2.4e6
+    plan = plan_decimation(fs, 48e3, 10e3)
+
+    y = plan(tone(5e3, fs, 240000))
+    assert abs(y.size - 4800) <= 1
+    assert np.abs(y[-1000:]).mean() == approx(1.0, abs=0.15)
+
+    # would alias onto 8 kHz
+    y = plan(tone(8e3 + 3 * 48e3, fs, 240000))
+    assert 20 * np.log10(np.abs(y[-1000:]).max()) < -55
+
+
+def test_cic_blocks():
+    x = tone(1e3, 1e6, 10000) * 1j
+    ref = CIC(25, 4)(x)
+
+    cic = CIC(25, 4)
+    y = np.concatenate([cic(x[i : i + 777]) for i in range(0, x.size, 777)])
+    assert np.allclose(y, ref)
+
+
+def test_cic_dtype():
+    x = tone(1e3, 1e6, 10000) + 0.5
+    y = CIC(25, 4)(x)
+    assert y.dtype == np.complex64
+    assert np.allclose(y, CIC(25, 4)(x.astype(np.complex128)), atol=1e-6)
+
+    y = ru.downsample(x, 1e6, 48e3, fpass=10e3, precision="float32")
+    assert y.dtype == np.complex64
+
+
+def test_demod_multistage():
+    fs = 2.4e6
+    sig = tone(-100e3 + 1e3, fs, 480000)
+
+    ref = ru.ssb_demod(sig.copy(), fs, 48e3, 100e3, multistage=True)
+    out = np.concatenate(
+        list(ssb_demod_stream(sig, fs, 48e3, 100e3, blocksize=50000, multistage=True))
+    )
+    assert out.shape == ref.shape
+    assert abs(out.size - 9600) <= 1
+    assert np.allclose(out, ref, atol=1e-5)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from radioutils.nco import NCO
+
+
+def test_nco_accuracy():
+    fs = 2.4e6
+    fc = -312.5e3 + 0.1
+    n = 100000
+
+    ref = np.exp(2j * np.pi * fc * np.arange(n) / fs)
+    osc = NCO(fc, fs)(n)
+    assert osc.dtype == np.complex64
+    assert np.abs(osc - ref).max() < 1e-5
+
+    # phase is wrapped, so precision holds far into a long capture
+    n0 = 10**10
+    t = (n0 + np.arange(1000)) / fs
+    osc = NCO(fc, fs, phase=(fc * n0 / fs) % 1.0)(1000)
+    assert np.abs(osc - np.exp(2j * np.pi * fc * t)).max() < 1e-5
+
+
+def test_nco_blocks():
+    x = (np.random.default_rng(2).standard_normal(20000) + 0j).astype(np.complex64)
+
+    ref = NCO(1e3, 48e3).mix(x.copy())
+
+    nco = NCO(1e3, 48e3)
+    y = x.copy()
+    for i, j in [(0, 1), (1, 4096), (4096, 4097), (4097, 13333), (13333, 20000)]:
+        nco.mix(y[i:j])
+
+    assert np.array_equal(y, ref)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import radioutils as ru
+from radioutils.parallel import chain, demod_file
+from radioutils.stream import fm_stages
+from radioutils.synth import am_signal, fm_signal, ssb_signal, write_capture
+
+fs = 240e3
+fsaudio = 48e3
+n = 300000
+
+
+def test_chain():
+    # half-band by 2, then 2/5
+    period, outputs, memory = chain(fm_stages(fs, fsaudio, None, multistage=True))
+    assert (period, outputs) == (10, 2)
+    assert memory > 50
+
+
+@pytest.mark.parametrize(
+    "demod,signal,kwargs",
+    [
+        (ru.am_demod, am_signal, {"frumble": 100, "multistage": True}),
+        (ru.fm_demod, fm_signal, {"multistage": True}),
+        (ru.ssb_demod, ssb_signal, {}),
+    ],
+)
+def test_parallel(tmp_path, demod, signal, kwargs):
+    capture = write_capture(tmp_path / "cap.bin", signal(n, fs, -20e3))
+    ref = demod(capture, fs, fsaudio, 20e3, causal=True, **kwargs)
+
+    out = demod(capture, fs, fsaudio, 20e3, workers=2, **kwargs)
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-6)
+
+
+def test_segments(tmp_path):
+    capture = write_capture(tmp_path / "cap.bin", fm_signal(n, fs, -20e3))
+    ref = ru.fm_demod(capture, fs, fsaudio, 20e3, causal=True)
+    out = demod_file(capture, fs, fsaudio, 20e3, "fm", segments=7)
+    assert np.allclose(out, ref, atol=1e-6)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import scipy.io.wavfile
+
+from radioutils.pipeline import Pipeline, WavSink, demod_pipeline
+from radioutils.stream import _blocks, am_demod_stream, fm_demod_stream
+from radioutils.synth import am_signal, fm_signal
+
+fs = 240e3
+fsaudio = 48e3
+n = 50000
+
+
+def test_fm_pipeline():
+    sig = fm_signal(n, fs, -20e3)
+    ref = np.concatenate(list(fm_demod_stream(sig, fs, fsaudio, 20e3, 75e3, 4093)))
+
+    pipe = demod_pipeline(fs, fsaudio, 20e3, "fm", depth=2, fmdev=75e3)
+    out = np.concatenate(pipe.run(_blocks(sig, fs, 4093)))
+    assert np.array_equal(out, ref)
+
+    assert [s.name for s in pipe.stats] == ["read", "ddc", "demod", "sink"]
+    assert pipe.stats[0].items == pipe.stats[1].items == -(-sig.size // 4093)
+    assert all(s.depth_max <= 2 for s in pipe.stats)
+    assert "util %" in pipe.report()
+
+
+def test_wav_sink(tmp_path):
+    sig = am_signal(n, fs, -20e3)
+    ref = np.concatenate(list(am_demod_stream(sig, fs, fsaudio, 20e3, 5e3, 100, 3001)))
+
+    fn = tmp_path / "audio.wav"
+    with WavSink(fn, fsaudio) as sink:
+        pipe = demod_pipeline(fs, fsaudio, 20e3, "am", fcutoff=5e3, frumble=100)
+        assert pipe.run(_blocks(sig, fs, 3001), sink) is None
+
+    rate, audio = scipy.io.wavfile.read(fn)
+    assert rate == fsaudio
+    assert audio.dtype == np.float32 and audio.shape == (ref.size, 2)
+    assert np.allclose(audio[:, 0], ref.real.astype(np.float32))
+
+
+def test_error():
+    def fail(x):
+        raise ZeroDivisionError
+
+    blocks = (np.ones(100) for _ in range(1000))
+    with pytest.raises(ZeroDivisionError):
+        Pipeline([("copy", np.copy), ("fail", fail)], depth=1).run(blocks)
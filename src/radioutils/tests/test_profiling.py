@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+
+import radioutils as ru
+from radioutils.synth import am_signal, fm_signal, ssb_signal, write_capture
+
+fs = 240e3
+fsaudio = 48e3
+n = 48000
+
+
+def test_profiler(tmp_path):
+    sig = fm_signal(n, fs, -20e3)
+    ref = ru.fm_demod(sig.copy(), fs, fsaudio, 20e3, 75e3)
+
+    with ru.Profiler(memory=True) as prof:
+        out = ru.fm_demod(sig.copy(), fs, fsaudio, 20e3, 75e3, profiler=prof)
+        ru.am_demod(am_signal(n, fs, -20e3), fs, fsaudio, 20e3, 5e3, frumble=100, profiler=prof)
+    assert np.array_equal(out, ref)
+
+    stages = [r.stage for r in prof.records]
+    assert stages[:5] == [
+        "as_precision",
+        "freq_translate",
+        "final_filter",
+        "discriminate",
+        "downsample",
+    ]
+    assert "square" in stages and "rumble_filter" in stages
+
+    r = prof.records[1]
+    assert r.samples == sig.size and r.seconds > 0 and r.rate > 0
+    assert all(r.peak_bytes >= 0 for r in prof.records)
+
+    totals = prof.totals()
+    assert totals["final_filter"].samples == sig.size + sig.size // 5
+    assert "discriminate" in prof.report()
+
+    fn = tmp_path / "prof.jsonl"
+    prof.write_jsonl(fn)
+    lines = [json.loads(line) for line in fn.read_text().splitlines()]
+    assert len(lines) == len(prof.records)
+    assert lines[0]["stage"] == "as_precision" and "samples_per_s" in lines[0]
+
+
+def test_profiler_file(tmp_path):
+    fn = write_capture(tmp_path / "cap.bin", ssb_signal(n, fs, -20e3))
+
+    prof = ru.Profiler()
+    ru.ssb_demod(fn, fs, fsaudio, 20e3, profiler=prof)
+    assert [r.stage for r in prof.records] == [
+        "loadbin",
+        "as_precision",
+        "freq_translate",
+        "downsample",
+    ]
+    assert prof.records[0].samples == n
+    assert prof.records[0].peak_bytes is None
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import radioutils as ru
+from radioutils.reader import BlockReader, madvise
+from radioutils.stream import iterbin
+
+fs = 100e3
+
+
+@pytest.mark.parametrize("dtype", ["cu8", "cs16", "cf32"])
+def test_reader(tmp_path, dtype):
+    fn = tmp_path / "cap.bin"
+    rng = np.random.default_rng(0)
+    raw = rng.integers(0, 256, 2 * 10001).astype(ru.iq_format(dtype).raw)
+    raw.tofile(fn)
+
+    ref = list(iterbin(fn, fs, 1000, isamp=(123, 9000), dtype=dtype))
+    reader = BlockReader(fn, fs, 1000, isamp=(123, 9000), dtype=dtype, readahead=2)
+    blocks = list(reader)
+    assert len(blocks) == len(ref) == 9
+    for x, y in zip(blocks, ref):
+        assert np.array_equal(x, y)
+    # blocks are not overwritten by later reads
+    assert np.array_equal(np.concatenate(blocks), ru.loadbin(fn, fs, dtype=dtype)[123:9000])
+
+    assert np.array_equal(
+        np.concatenate(list(iterbin(fn, fs, 4096, dtype=dtype, readahead=3))),
+        ru.loadbin(fn, fs, dtype=dtype),
+    )
+
+
+def test_reader_partial(tmp_path):
+    fn = tmp_path / "cap.bin"
+    np.arange(2 * 5000, dtype=np.float32).tofile(fn)
+    with fn.open("ab") as f:
+        f.write(b"\0\0\0")  # trailing partial sample
+
+    blocks = BlockReader(fn, fs, 700, readahead=1)
+    assert np.array_equal(np.concatenate(list(blocks)), ru.loadbin(fn, fs))
+
+    # stopping early releases the reader thread
+    it = iter(BlockReader(fn, fs, 100))
+    assert next(it).size == 100
+    it.close()
+
+    assert not list(BlockReader(fn, fs, 100, isamp=(6000, 7000)))
+
+
+def test_madvise(tmp_path):
+    fn = tmp_path / "cap.bin"
+    np.arange(2 * 100000, dtype=np.float32).tofile(fn)
+
+    # slices not starting on a page, and arrays that are not memory-mapped
+    sig = ru.loadbin(fn, fs, isamp=(1001, 90001), mmap=True, prefetch=True)
+    assert np.array_equal(sig, ru.loadbin(fn, fs, isamp=(1001, 90001)))
+    for a in (sig, sig[:0], np.zeros(10)):
+        madvise(a, "dontneed")
@@ -0,0 +1,163 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import radioutils as ru
+from radioutils.stream import am_demod_stream, fm_demod_stream, ssb_demod_stream
+from radioutils.synth import am_signal, fm_signal, ssb_signal, write_capture
+
+fs = 240e3
+fsaudio = 48e3
+n = 50000
+# synthetic signal of each demodulator, on a carrier the demodulators translate by +fc
+SIGNALS = [(ru.am_demod, am_signal), (ru.fm_demod, fm_signal), (ru.ssb_demod, ssb_signal)]
+
+
+@pytest.mark.parametrize("blocksize", [1000, 4093, 2**16])
+def test_am_stream(blocksize):
+    sig = am_signal(n, fs, -20e3)
+    ref = ru.am_demod(sig.copy(), fs, fsaudio, 20e3, 5e3, frumble=100, causal=True)
+    out = np.concatenate(list(am_demod_stream(sig, fs, fsaudio, 20e3, 5e3, 100, blocksize)))
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-9)
+
+
+@pytest.mark.parametrize("blocksize", [1000, 4093])
+def test_fm_stream(blocksize):
+    sig = fm_signal(n, fs, -20e3, fmdev=10e3)
+    ref = ru.fm_demod(sig.copy(), fs, fsaudio, 20e3, 75e3, causal=True)
+    out = np.concatenate(list(fm_demod_stream(sig, fs, fsaudio, 20e3, 75e3, blocksize)))
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-9)
+
+
+def test_ssb_stream(tmp_path):
+    sig = ssb_signal(n, fs, -20e3)
+    fn = tmp_path / "cap.bin"
+    sig.tofile(fn)
+
+    ref = ru.ssb_demod(sig.copy(), fs, fsaudio, 20e3, causal=True)
+    out = np.concatenate(list(ssb_demod_stream(fn, fs, fsaudio, 20e3, blocksize=3001)))
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-9)
+
+
+def test_ddc():
+    sig = am_signal(n, fs, -20e3)
+    ref = ru.am_demod(sig.copy(), fs, fsaudio, 20e3, 5e3, causal=True)
+    out = ru.am_demod(sig, fs, fsaudio, 20e3, 5e3, ddc=True)
+    assert np.allclose(out, ref, atol=1e-9)
+
+    sig = ssb_signal(n, fs, -20e3)
+    ref = ru.ssb_demod(sig.copy(), fs, fsaudio, 20e3, causal=True)
+    assert np.allclose(ru.ssb_demod(sig, fs, fsaudio, 20e3, ddc=True), ref, atol=1e-9)
+
+
+def test_fm_ddc():
+    fs = 2.4e6
+    sig = fm_signal(480000, fs, -300e3, fmdev=75e3, snr=None)
+
+    out = ru.fm_demod(sig.copy(), fs, fsaudio, 300e3, causal=True, ddc=True)
+    assert abs(out.size - 9600) <= 1
+    # tone amplitude fmdev / (sqrt(2) fmdev)
+    assert np.abs(out[2000:]).max() == pytest.approx(1 / np.sqrt(2), rel=0.05)
+
+    blocks = fm_demod_stream(sig, fs, fsaudio, 300e3, blocksize=30000, ddc=True)
+    assert np.allclose(np.concatenate(list(blocks)), out, atol=1e-6)
+
+
+@pytest.mark.parametrize("demod,signal", SIGNALS)
+def test_float32(demod, signal):
+    sig = signal(n, fs, -20e3)
+    ref = demod(sig.astype(np.complex128), fs, fsaudio, 20e3, causal=True)
+    out = demod(sig.copy(), fs, fsaudio, 20e3, causal=True, precision="float32")
+    assert out.dtype in (np.float32, np.complex64)
+    assert np.abs(out - ref).max() < 1e-4 * np.abs(ref).max()
+
+
+def test_float32_stream():
+    sig = am_signal(n, fs, -20e3)
+    ref = ru.am_demod(sig.copy(), fs, fsaudio, 20e3, 5e3, causal=True, precision="float32")
+    blocks = am_demod_stream(sig, fs, fsaudio, 20e3, 5e3, blocksize=4093, precision="float32")
+    out = np.concatenate(list(blocks))
+    assert out.dtype == np.complex64
+    assert np.allclose(out, ref, atol=1e-6)
+
+
+@pytest.mark.parametrize("demod,signal", SIGNALS)
+def test_workspace(demod, signal):
+    sig = signal(n, fs, -20e3)
+    ref = demod(sig.copy(), fs, fsaudio, 20e3, causal=True)
+
+    ws = ru.Workspace()
+    for m in (n, 40000, n):
+        out = demod(sig[:m].copy(), fs, fsaudio, 20e3, causal=True, workspace=ws)
+    assert np.array_equal(out, ref)
+
+    # steady state: buffers, filters and oscillator are reused, only small temporaries remain
+    x = sig.copy()
+    tracemalloc.start()
+    try:
+        demod(x, fs, fsaudio, 20e3, causal=True, workspace=ws)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 16e3 < sig.nbytes / 20
+
+
+@pytest.mark.parametrize("demod,signal", SIGNALS)
+@pytest.mark.parametrize("kwargs", [{}, {"causal": True}, {"ddc": True, "multistage": True}])
+def test_channels(demod, signal, kwargs):
+    fc = np.array([20e3, -10e3, 35e3])
+    sig = np.stack([signal(20000, fs, -f, seed=i) for i, f in enumerate(fc)])
+    ref = np.stack([demod(s.copy(), fs, fsaudio, f, **kwargs) for s, f in zip(sig, fc)])
+
+    out = demod(sig.copy(), fs, fsaudio, fc, **kwargs)
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-6)
+
+    out = demod(sig.T.copy(), fs, fsaudio, fc, axis=0, **kwargs)
+    assert np.allclose(out.T, ref, atol=1e-6)
+
+
+def test_channels_stream():
+    fc = np.array([20e3, -10e3])
+    sig = np.stack([fm_signal(20000, fs, -f, fmdev=10e3, seed=i) for i, f in enumerate(fc)])
+    ref = ru.fm_demod(sig.copy(), fs, fsaudio, fc, causal=True)
+    out = np.concatenate(list(fm_demod_stream(sig, fs, fsaudio, fc, blocksize=3001)), axis=-1)
+    assert np.allclose(out, ref, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "demod,stream,signal,kwargs",
+    [
+        (ru.am_demod, am_demod_stream, am_signal, {}),
+        (ru.fm_demod, fm_demod_stream, fm_signal, {"fmdev": 5e3}),
+        (ru.ssb_demod, ssb_demod_stream, ssb_signal, {}),
+    ],
+)
+def test_audio_rate(tmp_path, demod, stream, signal, kwargs):
+    # a capture already at the audio rate is not resampled
+    sig = signal(20000, fsaudio, -2e3, **kwargs)
+    fn = tmp_path / "cap.bin"
+    sig.tofile(fn)
+
+    ref = demod(sig.copy(), fsaudio, fsaudio, 2e3, causal=True, **kwargs)
+    for kw in ({}, {"ddc": True}, {"ddc": True, "multistage": True}, {"workers": 2}):
+        out = demod(fn, fsaudio, fsaudio, 2e3, causal=True, **kwargs, **kw)
+        assert np.allclose(out, ref, atol=1e-6)
+    for src in (sig, fn):
+        out = np.concatenate(list(stream(src, fsaudio, fsaudio, 2e3, blocksize=3001, **kwargs)))
+        assert np.allclose(out, ref, atol=1e-6)
+
+
+def test_am_no_cutoff(tmp_path):
+    # fcutoff=None skips the audio lowpass, as in am_demod
+    sig = am_signal(n, fs, -20e3)
+    fn = write_capture(tmp_path / "cap.bin", sig)
+    ref = ru.am_demod(sig.copy(), fs, fsaudio, 20e3, None, causal=True)
+
+    out = np.concatenate(list(am_demod_stream(sig, fs, fsaudio, 20e3, None, blocksize=4093)))
+    assert np.allclose(out, ref, atol=1e-9)
+    assert np.allclose(ru.am_demod(fn, fs, fsaudio, 20e3, None, workers=2), ref, atol=1e-6)
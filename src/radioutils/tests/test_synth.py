@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import radioutils as ru
+from radioutils.stream import fm_demod_stream
+from radioutils.synth import am_signal, fm_signal, ssb_signal, write_capture
+
+fs = 240e3
+fsaudio = 48e3
+n = 48000
+
+
+def tone_power(audio, f=1e3):
+    """fraction of the audio power in the tone at f, past the filter transients"""
+    x = np.real(audio[2000:]) - np.real(audio[2000:]).mean()
+    X = np.abs(np.fft.rfft(x)) ** 2
+    k = round(f * x.size / fsaudio)
+    return X[k - 2 : k + 3].sum() / X.sum()
+
+
+def test_deterministic():
+    assert np.array_equal(fm_signal(n, fs, 20e3, seed=1), fm_signal(n, fs, 20e3, seed=1))
+    assert not np.array_equal(fm_signal(n, fs, 20e3, seed=1), fm_signal(n, fs, 20e3, seed=2))
+    sig = am_signal(n, fs, 20e3, snr=None)
+    assert sig.dtype == np.complex64
+    assert np.abs(sig).max() == pytest.approx(0.7, rel=1e-6)
+
+
+def test_demod():
+    assert tone_power(ru.am_demod(am_signal(n, fs, 20e3), fs, fsaudio, -20e3, 5e3)) > 0.9
+    assert (
+        tone_power(ru.fm_demod(fm_signal(n, fs, 20e3, fmdev=5e3), fs, fsaudio, -20e3, 5e3)) > 0.9
+    )
+    assert tone_power(ru.ssb_demod(ssb_signal(n, fs, 20e3), fs, fsaudio, -20e3)) > 0.9
+
+
+@pytest.mark.parametrize("dtype", ["cu8", "cs8", "cs16", "cf32"])
+def test_write_capture(tmp_path, dtype):
+    sig = fm_signal(n, fs, 20e3)
+    fn = write_capture(tmp_path / f"cap.{dtype}", sig, dtype, fs=fs, fc=100e6)
+    meta = ru.sigmf_meta(fn)
+    assert meta["fs"] == fs and meta["center_freq"] == 100e6
+    assert ru.iq_format(meta["dtype"]) == ru.iq_format(dtype)
+
+    out = ru.loadbin(fn, None)
+    tol = {"cu8": 1 / 127.5, "cs8": 1 / 128, "cs16": 1 / 32768, "cf32": 0}[dtype]
+    assert np.abs(out.real - sig.real).max() <= tol
+    assert np.abs(out.imag - sig.imag).max() <= tol
+
+
+def test_capture_fs(tmp_path):
+    # the module docstring example: fs from the SigMF sidecar
+    fn = write_capture(tmp_path / "fm.cu8", fm_signal(n, fs, 20e3), "cu8", fs=fs)
+    ref = ru.fm_demod(fn, fs, fsaudio, fc=-20e3, causal=True)
+    assert np.array_equal(ru.fm_demod(fn, None, fsaudio, fc=-20e3, causal=True), ref)
+
+    blocks = fm_demod_stream(fn, None, fsaudio, fc=-20e3, blocksize=5000)
+    assert np.allclose(np.concatenate(list(blocks)), ref, atol=1e-6)
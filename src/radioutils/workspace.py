@@ -0,0 +1,64 @@
+"""
+Reusable scratch buffers
+
+A Workspace hands out named buffers that are allocated once and reused on every later
+request of the same name, growing only when a larger one is needed.
+Demodulating many short bursts with one workspace, e.g.
+
+    ws = Workspace()
+    for burst in bursts:
+        audio = fm_demod(burst, fs, 48000, fc, causal=True, workspace=ws)
+
+then reuses the translated, discriminated and resampled intermediate arrays, and the
+oscillator, filter and resampler objects with their tables and scratch buffers, instead of
+allocating them per burst. Buffers are overwritten by the next request of the same name,
+so results that outlive the call must be copied by the caller.
+"""
+
+import math
+
+import numpy as np
+
+
+class Workspace:
+    def __init__(self):
+        self._buffers: dict[str, np.ndarray] = {}
+        self._stages: dict[str, tuple] = {}
+        self.allocations = 0  # buffers and stage objects made so far, constant in steady state
+
+    def buffer(self, name: str, shape, dtype) -> np.ndarray:
+        """
+        uninitialized array of "shape" and "dtype", a view of the reused buffer "name"
+        """
+        shape = (shape,) if isinstance(shape, (int, np.integer)) else tuple(shape)
+        dtype = np.dtype(dtype)
+        n = math.prod(shape)
+
+        b = self._buffers.get(name)
+        if b is None or b.dtype != dtype or b.size < n:
+            # grow geometrically, so slowly increasing sizes reallocate rarely
+            size = n if b is None or b.dtype != dtype else max(n, b.size + b.size // 2)
+            b = self._buffers[name] = np.empty(size, dtype)
+            self.allocations += 1
+
+        return b[:n].reshape(shape)
+
+    def stage(self, name: str, key, factory):
+        """
+        stage object "name" (e.g. a Resampler) made by factory(), and reused while "key"
+        (the parameters it was made with) is unchanged. Callers reset its state for each signal.
+        """
+        s = self._stages.get(name)
+        if s is None or s[0] != key:
+            s = self._stages[name] = (key, factory())
+            self.allocations += 1
+
+        return s[1]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(b.nbytes for b in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
+        self._stages.clear()